@@ -1,10 +1,17 @@
+import array
+import collections
 import enum
+import io
 import itertools
-from typing import Dict, Generator, List, Optional, Tuple, Union
-import pandas as pd
+import re
+from typing import Dict, Generator, Iterable, List, Optional, Tuple, Union
 import json
 
-import collections
+import numpy as np
+
+from pybracelet.encoding import apply_rule, invert_rule
+from pybracelet.node_grid import NodeGrid
+from pybracelet.permutations import MultisetPermutations
 
 
 class Assortment(Dict[int,int]):
@@ -25,14 +32,14 @@ class Assortment(Dict[int,int]):
         total_count = sum(self.values())
         return total_count <= max_wire_count
     
-    def generate_valid_inputs(self, max_wire_count: int) -> Generator[List[int], None, None]:
+    def valid_input_spaces(self, max_wire_count: int) -> Generator[MultisetPermutations, None, None]:
         """
-        Generates all valid combinations of color indices based on the assortment's minimum counts.
-        Each combination is exactly `max_wire_count` in length, filling with additional wires if needed.
+        Generates the permutation spaces that make up the valid inputs, one per way of
+        filling the remaining slots. Each space is a multiset of exactly `max_wire_count` wires.
 
         :param max_wire_count: Maximum number of wires in the bracelet
         :raises ValueError: If the assortment exceeds the maximum wire count
-        :return: Generator of lists, each representing a valid assortment of color indices
+        :return: Generator of MultisetPermutations
         """
         total_minimum_count = sum(self.values())
         if total_minimum_count > max_wire_count:
@@ -49,14 +56,70 @@ class Assortment(Dict[int,int]):
 
         # Generate all possible combinations for remaining slots
         for extra_combination in itertools.combinations_with_replacement(color_indices, remaining_slots):
-            # Combine fixed colors and extra colors
-            full_combination = fixed_colors + list(extra_combination)
-
-            # Generate unique permutations
-            for permutation in set(itertools.permutations(full_combination)):
-                yield list(permutation)
-       
-   
+            yield MultisetPermutations(fixed_colors + list(extra_combination))
+
+    def count_valid_inputs(self, max_wire_count: int) -> int:
+        """
+        Returns the number of valid inputs, without enumerating them.
+
+        :param max_wire_count: Maximum number of wires in the bracelet
+        """
+        return sum(space.count() for space in self.valid_input_spaces(max_wire_count))
+
+    def nth_valid_input(self, max_wire_count: int, index: int) -> List[int]:
+        """
+        Returns the valid input at the given position of `generate_valid_inputs`.
+
+        :param max_wire_count: Maximum number of wires in the bracelet
+        :param index: Position of the input, 0 <= index < count_valid_inputs()
+        :raises IndexError: If the index is out of range
+        """
+        if index >= 0:
+            for space in self.valid_input_spaces(max_wire_count):
+                space_count = space.count()
+                if index < space_count:
+                    return space.nth(index)
+                index -= space_count
+        raise IndexError("Valid input index out of range")
+
+    def is_valid_input(self, wire_colors: Iterable[int], max_wire_count: int) -> bool:
+        """
+        Returns True if the wire colors are one of the valid inputs, without enumerating them:
+        exactly `max_wire_count` wires of the assortment's colors, each color at least its count.
+
+        :param wire_colors: Color indices of the wires
+        :param max_wire_count: Maximum number of wires in the bracelet
+        """
+        counts = collections.Counter(wire_colors)
+        if sum(counts.values()) != max_wire_count or not all(color in self for color in counts):
+            return False
+        return all(counts[color] >= min_count for color, min_count in self.items())
+
+    def generate_valid_inputs(self, max_wire_count: int, start: int = 0, stop: Optional[int] = None) -> Generator[List[int], None, None]:
+        """
+        Generates all valid combinations of color indices based on the assortment's minimum counts.
+        Each combination is exactly `max_wire_count` in length, filling with additional wires if needed.
+
+        Inputs are streamed without materializing the permutations, each distinct one exactly once.
+        `start` and `stop` select a slice of the sequence, so that it can be sharded by index.
+
+        :param max_wire_count: Maximum number of wires in the bracelet
+        :param start: Index of the first input to yield
+        :param stop: Index one past the last input to yield, None for the end
+        :raises ValueError: If the assortment exceeds the maximum wire count
+        :return: Generator of lists, each representing a valid assortment of color indices
+        """
+        offset = 0
+        for space in self.valid_input_spaces(max_wire_count):
+            if stop is not None and offset >= stop:
+                return
+            space_count = space.count()
+            if start < offset + space_count:
+                local_stop = None if stop is None else stop - offset
+                yield from space.iterate(max(start - offset, 0), local_stop)
+            offset += space_count
+
+
 def rowColToPixRect(colidx, rowidx,masterScale):
     xpad = int(0.95*masterScale)
     ypad = int(0.9*masterScale)
@@ -71,6 +134,11 @@ def rowColToPixRect(colidx, rowidx,masterScale):
         return (sx+xpad,sy+ypad) , (sx+masterScale-xpad,sy+masterScale-ypad)
 
 
+def rowColToPixCenter(colidx, rowidx, masterScale):
+    f, t = rowColToPixRect(colidx, rowidx, masterScale)
+    return (f[0] + t[0])//2, (f[1] + t[1])//2
+
+
 class BData():
     """Data class for representing a bracelet's wire configuration.
     
@@ -89,13 +157,17 @@ class BData():
         self.wireCount = wireCount
         self.colCount = colCount 
         self.backGroundColor = '#000000'
-        self.nodes=dict()
+        self.nodes=NodeGrid(colCount, wireCount)
         self.maxColorCount = 12
 
         self.colorRegistry = {i:"#FFFFFF" for i in range(self.maxColorCount)}
         self.colorRegistry[1] = "#FF0000"
         self.colorRegistry[2] = "#00FF00"
         self.colorRegistry[3] = "#0000FF"
+
+        # node centers, computed lazily for the geometry they were computed with
+        self._centers = None
+        self._centers_geometry = None
         self._initNodes()
 
 
@@ -114,26 +186,82 @@ class BData():
 
     def _initNodes(self):
 
-        knownnodes = self.nodes
-        self.nodes = dict()
-        centers = []
-        for colidx in range(self.colCount):
-            maxrowShit = 0 if colidx%2 == 0 else -1 # odd columns are shifted down by one row
-            for rowidx in range(self.wireCount//2 + maxrowShit):
+        # keep the colors of the nodes that still exist, new nodes get color 0
+        self.nodes = self.nodes.resized(self.colCount, self.wireCount)
+
+    @property
+    def centers(self) -> np.ndarray:
+        """
+        Pixel centers of the nodes, as a record array with fields colidx, rowidx, xcenter and ycenter,
+        one record per node in node order.
 
-                idx = (colidx,rowidx)
-                if idx in knownnodes:
-                    self.nodes[idx] = knownnodes[idx]
-                else:
-                    self.nodes[idx] = 0
+        Centers are computed on first access and cached until the geometry
+        (wireCount, colCount, masterScale) changes.
+        """
+        geometry = (self.wireCount, self.colCount, self.masterScale)
+        if self._centers_geometry != geometry:
+            self._centers = self._computeCenters()
+            self._centers_geometry = geometry
+        return self._centers
 
-                f, t = rowColToPixRect(colidx, rowidx,self.masterScale)
-                xcenter = (f[0] + t[0])//2
-                ycenter = (f[1] + t[1])//2
+    def findNode(self, x, y) -> Tuple[int, int]:
+        """
+        Returns the (colidx, rowidx) of the node whose center is the nearest to the pixel (x, y).
 
-                centers.append([colidx, rowidx,xcenter,ycenter])
+        Node centers sit on a checkerboard lattice of step masterScale/2: column c is at x = (c+1)*step,
+        and its row r at y = (2r+1)*step for even columns, (2r+2)*step for odd ones.
+        The pixel is rounded to that lattice in constant time; only clicks decoded outside of the canvas,
+        or any click when masterScale is odd (centers are then rounded), compare a few neighbouring centers.
+        """
+        step = self.masterScale / 2
+        u = x / step - 1
+        v = y / step - 1
+
+        colidx, vidx = round(u), round(v)
+        if (colidx + vidx) % 2:
+            # off the checkerboard, move along the axis with the largest rounding error
+            if abs(u - colidx) > abs(v - vidx):
+                colidx += 1 if u > colidx else -1
+            else:
+                vidx += 1 if v > vidx else -1
+        rowidx = (vidx - colidx % 2) // 2
+
+        if self.masterScale % 2 == 0 and (colidx, rowidx) in self.nodes:
+            return colidx, rowidx
+        return self._nearestNodeAround(x, y, colidx, rowidx)
+
+    def _nearestNodeAround(self, x, y, colidx, rowidx) -> Tuple[int, int]:
+        colidx = min(max(colidx, 0), self.colCount - 1)
+        best = None
+        for col in range(max(colidx - 2, 0), min(colidx + 3, self.colCount)):
+            last_row = self.nodes.node_count(col) - 1
+            if last_row < 0:
+                # odd columns hold no node below 4 wires
+                continue
+            for row in range(rowidx - 1, rowidx + 2):
+                row = min(max(row, 0), last_row)
+                xcenter, ycenter = rowColToPixCenter(col, row, self.masterScale)
+                distance = (xcenter - x)**2 + (ycenter - y)**2
+                if best is None or distance < best[0]:
+                    best = (distance, col, row)
+        return best[1], best[2]
+
+    def _computeCenters(self) -> np.ndarray:
+        # same geometry as rowColToPixRect, broadcast over every node
+        colidx, rowidx = np.nonzero(self.nodes.mask)
+        odd_shift = (colidx % 2) * (self.masterScale // 2)
+        sx = (colidx // 2) * self.masterScale + odd_shift
+        sy = rowidx * self.masterScale + odd_shift
+
+        centers = np.empty(len(colidx), dtype=[("colidx", np.int64), ("rowidx", np.int64),
+                                               ("xcenter", np.int64), ("ycenter", np.int64)])
+        centers["colidx"] = colidx
+        centers["rowidx"] = rowidx
+        centers["xcenter"] = (2 * sx + self.masterScale) // 2
+        centers["ycenter"] = (2 * sy + self.masterScale) // 2
+        centers.flags.writeable = False
+        return centers
 
-        self.centers = pd.DataFrame(centers,columns=["colidx", "rowidx","xcenter","ycenter"])
     def toJson(self,indent=4) -> str:
         nodes = [[k1,k2,v] for (k1,k2),v in self.nodes.items()]
         return json.dumps((self.colorRegistry,nodes),indent=indent)
@@ -144,60 +272,100 @@ class BData():
         :param jsonstr: JSON string containing color registry and nodes
         :return: BData instance
         """
-        # Parse the JSON string
-        colorRegistry, nodes = json.loads(jsonstr)
-        
-        df_nodes = pd.DataFrame(nodes, columns=["colidx", "rowidx", "coloridx"])
-        wireCount = (df_nodes["rowidx"].max()+1)*2
-        column_count = df_nodes["colidx"].max() + 1
-        # Create a new BData instance
-        bdata = BData(wireCount=wireCount, colCount=column_count, masterScale=64)  # Assuming a default masterScale
-        # Set the color registry    
+        return cls.fromJsonFile(io.StringIO(jsonstr))
+
+    @classmethod
+    def fromJsonFile(cls,fin,chunk_size=1<<16) -> 'BData':
+        """
+        Reads the JSON written by toJson incrementally from a file object.
+        The dimensions are found while the nodes are read, and the node grid is filled in one go.
+
+        :param fin: Text file object positioned at the start of the JSON
+        :param chunk_size: Number of characters read at a time
+        :raises ValueError: If the JSON does not hold a bracelet
+        :return: BData instance
+        """
+        decoder = json.JSONDecoder()
+        buffer = ""
+        eof = False
+
+        def read_more():
+            nonlocal buffer, eof
+            chunk = fin.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+
+        # the color registry, then the opening bracket of the node list
+        colorRegistry = None
+        while colorRegistry is None:
+            start = buffer.find("{")
+            if start >= 0:
+                try:
+                    colorRegistry, end = decoder.raw_decode(buffer, start)
+                except json.JSONDecodeError:
+                    pass
+            if colorRegistry is None:
+                if eof:
+                    raise ValueError("No color registry found in bracelet JSON")
+                read_more()
+        node_list = re.compile(r'\s*,\s*\[')
+        opening = node_list.match(buffer, end)
+        while opening is None and not eof:
+            read_more()
+            opening = node_list.match(buffer, end)
+        if opening is None:
+            raise ValueError("No node list found in bracelet JSON")
+        buffer = buffer[opening.end():]
+
+        # the nodes, numbers are only taken up to the last closing bracket read, so never cut
+        numbers = array.array("q")
+        integer = re.compile(r'-?\d+')
+        while True:
+            last = buffer.rfind("]")
+            if last >= 0:
+                numbers.extend(map(int, integer.findall(buffer, 0, last)))
+                buffer = buffer[last + 1:]
+            if eof:
+                break
+            read_more()
+
+        nodes = np.frombuffer(numbers, dtype=np.int64)
+        if nodes.size == 0 or nodes.size % 3:
+            raise ValueError("Malformed node list in bracelet JSON")
+        colidx, rowidx, coloridx = nodes.reshape(-1, 3).T
+
+        bdata = BData(wireCount=(int(rowidx.max())+1)*2, colCount=int(colidx.max())+1, masterScale=64)  # Assuming a default masterScale
         bdata.colorRegistry = {int(k):v for k,v in colorRegistry.items()}
-        # Populate the nodes
-        for colidx, rowidx, coloridx in nodes:
-            bdata.nodes[(colidx, rowidx)] = coloridx    
-        # Reinitialize centers based on the new nodes
-        bdata._initNodes()
+        if colidx.min() < 0 or rowidx.min() < 0 or not bdata.nodes.mask[colidx, rowidx].all():
+            raise ValueError("Node outside of the bracelet in bracelet JSON")
+        if coloridx.min() < 0 or coloridx.max() > np.iinfo(bdata.nodes.colors.dtype).max:
+            raise ValueError("Color index out of range in bracelet JSON")
+        bdata.nodes.colors[colidx, rowidx] = coloridx
         return bdata
 
 
     def get_column(self,column_index):
         """
-        Returns a list of color indices for the specified column.
+        Returns a list of (column index, row index, color index) for the specified column, sorted by row index.
+        """
+        return [(column_index,row_idx,color_idx) for row_idx,color_idx in enumerate(self.nodes.column(column_index).tolist())]
+
+    def column_colors(self,column_index):
+        """
+        Returns the color indices of the specified column, sorted by row index, as a view on the node grid.
         """
-        column = []
-        for (col_idx,row_idx),color_idx in self.nodes.items():
-            if col_idx == column_index:
-                column.append((col_idx,row_idx,color_idx))
-        # sort column by row index
-        column.sort(key=lambda x: x[1])
-        return column
+        return self.nodes.column(column_index)
     
     
     def wire_assortment(self) -> 'Assortment':
         """
-        Returns a dictionary with the count of each color used in the nodes.
-        """
-
-        assortment = Assortment()
-        # for every columns get the colors:
-        for col_idx in range(self.colCount):
-            column = self.get_column(col_idx)
-            colors = [color_idx for _, _, color_idx in column]
-
-            # Count occurrences of each color (group and count using python collections)
-            color_count = collections.Counter(colors)
+        Returns a dictionary with, for each color used in the nodes, its highest count in a single column.
 
-            # Add to the assortment dictionary if the color is not already present or if the count is higher then insert the new count
-            for color_idx, count in color_count.items():
-                if color_idx in assortment :
-                    if assortment[color_idx] < count:
-                        assortment[color_idx] = count
-                else:
-                    assortment[color_idx] = count
-
-        return assortment
+        Counts come from per column histograms built in one pass over the node grid,
+        then kept up to date by setNodeColor, so repeated calls after an edit cost O(colors).
+        """
+        max_counts = self.nodes.max_color_counts()
+        return Assortment({color_idx: count for color_idx, count in enumerate(max_counts.tolist()) if count > 0})
 
 
     def validate_assortment(self,assortment: Dict[int,int]) -> bool:
@@ -209,11 +377,32 @@ class BData():
         total_count = sum(assortment.values())
         # Check if the total count exceeds the maximum wire count
         return total_count <= self.wireCount
-    
+
+    def column_period(self) -> int:
+        """
+        Returns the minimal column period of the painted pattern: the smallest p such that
+        column c and column c + p hold the same colors for every c.
+        Returns colCount when the pattern does not repeat.
+        """
+        columns = [self.column_colors(col_idx).tobytes() for col_idx in range(self.colCount)]
+
+        # prefix function (KMP): the longest border of the column sequence gives its minimal period
+        borders = [0] * len(columns)
+        for i in range(1, len(columns)):
+            k = borders[i - 1]
+            while k > 0 and columns[i] != columns[k]:
+                k = borders[k - 1]
+            if columns[i] == columns[k]:
+                k += 1
+            borders[i] = k
+        # even and odd columns have different node counts, so the period is always even
+        return len(columns) - borders[-1] if columns else 0
+
 class NodeType(enum.Enum):
     """
     Enumeration for the types of nodes in a bracelet.
     Each type corresponds to a specific configuration of left and right input wires.
+    The rules themselves live in `encoding.NODE_RULES`, the value is the 2 bit code of the type.
     """
     LL = 0 # 00 : Flip, right
     RR = 1 # 01 : Flip, left
@@ -230,22 +419,19 @@ class NodeType(enum.Enum):
             node_color: int
             output_wires: tuple[int, int]
         """
-        if self == NodeType.LL:
-            node_color = right_color
-            output_wires = (right_color, left_color)
-        elif self == NodeType.LR:
-            node_color = right_color
-            output_wires = (left_color, right_color)
-        elif self == NodeType.RR:
-            node_color = left_color
-            output_wires = (right_color, left_color)
-        elif self == NodeType.RL:
-            node_color = left_color
-            output_wires = (right_color, left_color)
-        else:
-            raise ValueError("Invalid node type")
+        return apply_rule(self.value, left_color, right_color)
 
-        return node_color, output_wires
+    def compute_input(self, left_output: int, right_output: int):
+        """
+        Given the color indices of the left and right output wires, compute:
+        - The resulting node color
+        - The input wire colors in (left, right) order
+
+        Returns:
+            node_color: int
+            input_wires: tuple[int, int]
+        """
+        return invert_rule(self.value, left_output, right_output)
 
 
             
@@ -270,6 +456,20 @@ class BChunk():
         # output wire colors, initialized to None
         self.output_wire_colors:List[Union[None,int]] = [None for _ in range(bdata.wireCount)]
 
+    @classmethod
+    def from_colors(cls, wire_count: int, colors: List[int]) -> "BChunk":
+        """
+        Builds the chunk of a column of the given node colors, outside of any bracelet:
+        an even column when it holds wire_count // 2 nodes, an odd column otherwise.
+        """
+        column_index = 0 if len(colors) == wire_count // 2 else 1
+        bdata = BData(wireCount=wire_count, colCount=column_index + 1)
+        if len(colors) != bdata.nodes.node_count(column_index):
+            raise ValueError(f"A column of {wire_count} wires can not hold {len(colors)} nodes")
+        for rowidx, color in enumerate(colors):
+            bdata.setNodeColor(column_index, rowidx, color)
+        return cls(bdata, column_index)
+
     def is_even_column(self):
         """
         Returns True if the column index is even, False otherwise.
@@ -356,6 +556,31 @@ class BChunk():
                                     NodeType.RL
                                   ], repeat=len(self.colors))
     
+    def admissible_node_types(self, node_index: int) -> List[NodeType]:
+        """
+        Returns the node types that give the node its expected color, from its two input wires.
+        Nodes are independent of each other given the input wire colors.
+        """
+        left_index, right_index = self.input_wire_indice_for_node(node_index)
+        left_color = self.input_wire_colors[left_index]
+        right_color = self.input_wire_colors[right_index]
+        return [node_type for node_type in NodeType
+                if node_type.compute_output(left_color, right_color)[0] == self.colors[node_index]]
+
+    def enumerate_admissible_nodetypes(self) -> Union[Tuple, itertools.product]:
+        """
+        Enumerates the node types that reproduce the chunk colors from the current input wire colors,
+        as the product of the admissible node types of every node.
+        Yields nothing as soon as one node has no admissible node type.
+        """
+        admissible = []
+        for i in range(len(self.colors)):
+            node_admissible = self.admissible_node_types(i)
+            if not node_admissible:
+                return ()
+            admissible.append(node_admissible)
+        return itertools.product(*admissible)
+
     def enumerate_possible_input_wire_colors(self, assortment:Assortment) -> Generator[Tuple[List[int], List[NodeType]], None, None]:
         """
         Enumerates all possible input wire color combinations based on the given assortment.
@@ -365,16 +590,11 @@ class BChunk():
             
         # Generate all valid input combinations based on the assortment
         for valid_input in assortment.generate_valid_inputs(max_wire_count=self.wire_count):
-            # try to find a valid solution for the current input
-            # validate current input
-
-            all_nodes_types = self.enumerate_possible_nodetypes(only_count=False)
-            for nt in all_nodes_types:
+            # only the admissible node types of each node are tried,
+            # an input is dropped as soon as one of its nodes cannot take its color
+            self.set_input_wire_colors(valid_input)
+            for nt in self.enumerate_admissible_nodetypes():
                 self.set_node_types(nt)
-                self.set_input_wire_colors(valid_input)
-                if self.check_and_compute_output():
+                self.compute_output()
 
-                    yield valid_input,self.node_types
-        
-    
-    
+                yield valid_input,self.node_types
@@ -0,0 +1,159 @@
+import mmap
+import struct
+import zlib
+from typing import Union
+
+import numpy as np
+
+from pybracelet.BData import BData
+
+
+# Binary bracelet format, little endian:
+#   header  : magic, version, flags, wireCount, colCount, masterScale
+#   strings : background color, then the color registry as (color index, color) entries
+#   payload : payload size, then the node colors in node order (column by column),
+#             4 bits per node when every color index is below 16, optionally zlib compressed
+MAGIC = b"BRCL"
+VERSION = 1
+
+FLAG_PACKED_4BIT = 0x01
+FLAG_ZLIB = 0x02
+
+_HEADER = struct.Struct("<4sBBHIH")
+_COUNT = struct.Struct("<H")
+_SIZE = struct.Struct("<I")
+
+
+def _pack_string(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    if len(encoded) > 255:
+        raise ValueError(f"Color {value!r} is too long to be stored")
+    return bytes([len(encoded)]) + encoded
+
+
+def _unpack_from(fmt: struct.Struct, buffer, offset: int):
+    # struct.error on a short buffer, the documented ValueError instead
+    if offset + fmt.size > len(buffer):
+        raise ValueError("Truncated bracelet file")
+    return fmt.unpack_from(buffer, offset)
+
+
+def _unpack_byte(buffer, offset: int) -> int:
+    if offset >= len(buffer):
+        raise ValueError("Truncated bracelet file")
+    return buffer[offset]
+
+
+def _unpack_string(buffer, offset: int):
+    length = _unpack_byte(buffer, offset)
+    if offset + 1 + length > len(buffer):
+        raise ValueError("Truncated bracelet file")
+    return bytes(buffer[offset + 1:offset + 1 + length]).decode("utf-8"), offset + 1 + length
+
+
+def dumps(bdata: BData, compress: bool = False) -> bytes:
+    """
+    Serializes a bracelet to the binary format.
+
+    :param bdata: The bracelet to serialize
+    :param compress: zlib compress the node colors
+    :return: The serialized bracelet
+    """
+    colors = bdata.nodes.colors[bdata.nodes.mask]
+
+    flags = 0
+    if colors.size == 0 or colors.max() < 16:
+        flags |= FLAG_PACKED_4BIT
+        if colors.size % 2:
+            colors = np.append(colors, np.uint8(0))
+        payload = ((colors[0::2] << 4) | colors[1::2]).astype(np.uint8).tobytes()
+    else:
+        payload = colors.tobytes()
+    if compress:
+        flags |= FLAG_ZLIB
+        payload = zlib.compress(payload)
+
+    parts = [_HEADER.pack(MAGIC, VERSION, flags, bdata.wireCount, bdata.colCount, bdata.masterScale),
+             _pack_string(bdata.backGroundColor),
+             _COUNT.pack(len(bdata.colorRegistry))]
+    for coloridx, color in bdata.colorRegistry.items():
+        parts.append(bytes([coloridx]) + _pack_string(color))
+    parts.append(_SIZE.pack(len(payload)))
+    parts.append(payload)
+    return b"".join(parts)
+
+
+def loads(buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> BData:
+    """
+    Reads a bracelet from a buffer holding the binary format.
+    The node colors are read straight from the buffer, which can be memory mapped.
+
+    :param buffer: The serialized bracelet
+    :raises ValueError: If the buffer does not hold a supported bracelet
+    :return: BData instance
+    """
+    buffer = memoryview(buffer)
+    magic, version, flags, wireCount, colCount, masterScale = _unpack_from(_HEADER, buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a bracelet file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported bracelet file version {version}")
+    offset = _HEADER.size
+
+    bdata = BData(wireCount=wireCount, colCount=colCount, masterScale=masterScale)
+    bdata.backGroundColor, offset = _unpack_string(buffer, offset)
+
+    (registry_count,) = _unpack_from(_COUNT, buffer, offset)
+    offset += _COUNT.size
+    colorRegistry = {}
+    for _ in range(registry_count):
+        coloridx = _unpack_byte(buffer, offset)
+        colorRegistry[coloridx], offset = _unpack_string(buffer, offset + 1)
+    bdata.colorRegistry = colorRegistry
+
+    (payload_size,) = _unpack_from(_SIZE, buffer, offset)
+    offset += _SIZE.size
+    if offset + payload_size > len(buffer):
+        raise ValueError("Truncated bracelet file")
+    if flags & FLAG_ZLIB:
+        try:
+            payload = np.frombuffer(zlib.decompress(buffer[offset:offset + payload_size]), dtype=np.uint8)
+        except zlib.error as e:
+            raise ValueError(f"Corrupt bracelet file: {e}") from e
+    else:
+        payload = np.frombuffer(buffer, dtype=np.uint8, count=payload_size, offset=offset)
+
+    node_count = len(bdata.nodes)
+    if flags & FLAG_PACKED_4BIT:
+        colors = np.empty(payload.size * 2, dtype=np.uint8)
+        colors[0::2] = payload >> 4
+        colors[1::2] = payload & 0x0F
+        colors = colors[:node_count]
+    else:
+        colors = payload[:node_count]
+    if colors.size != node_count:
+        raise ValueError("Truncated bracelet file")
+    bdata.nodes.colors[bdata.nodes.mask] = colors
+    return bdata
+
+
+def save(bdata: BData, path: str, compress: bool = False):
+    """
+    Writes a bracelet to a file in the binary format, see `dumps`.
+    """
+    with open(path, "wb") as fout:
+        fout.write(dumps(bdata, compress=compress))
+
+
+def load(path: str) -> BData:
+    """
+    Reads a bracelet from a binary file by memory mapping it, see `loads`.
+    """
+    with open(path, "rb") as fin:
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            try:
+                return loads(mapped)
+            except ValueError as e:
+                # the traceback holds views of the map, which could not be closed under it
+                error = str(e)
+    raise ValueError(error)
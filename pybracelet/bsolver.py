@@ -0,0 +1,338 @@
+import collections
+import itertools
+from typing import Any, Dict, Generator, Iterable, List, Optional, Set, Tuple
+
+from pybracelet.BData import Assortment, BChunk, BData, NodeType
+from pybracelet.encoding import TRANSITIONS, WIRE_COLOR_BITS, WIRE_COLOR_COUNT, WIRE_COLOR_MASK
+from pybracelet.engine import NODE_TYPES
+from pybracelet.simulate import encode_grid, simulate
+from pybracelet.solve_cache import ChunkSolutionCache
+
+
+WireState = Tuple[int, ...]
+NodeTypeGrid = List[Tuple[NodeType, ...]]
+
+
+class BSolver():
+    """
+    Solver for a whole bracelet: finds starting wires and a node type for every node
+    of every column so that knotting reproduces the painted colors of a BData.
+
+    Columns are chained: the output wire colors of a column are the input wire colors
+    of the next one. The search is depth first over (column index, wire ordering) states,
+    and states that cannot reach the last column are cached so they are never explored twice.
+    """
+
+    def __init__(self, bdata: BData, cache: Optional[ChunkSolutionCache] = None):
+        """
+        :param bdata: The bracelet to solve
+        :param cache: Solves every column through the cache, see `column_transitions`
+        """
+        self.bdata = bdata
+        self.chunks = [BChunk(bdata, column_index) for column_index in range(bdata.colCount)]
+        self.cache = cache
+        # (column index, wire multiset) -> input wires -> [(output wires, node types)], from the cache
+        self.cached_transitions: Dict[Tuple[int, Tuple[Tuple[int, int], ...]], Dict[WireState, List[Tuple[WireState, Tuple[NodeType, ...]]]]] = {}
+
+        # (column index, input wire colors) -> smallest column count it cannot reach,
+        # the state is dead for that horizon and every longer one, whatever the goal
+        self.dead_states: Dict[Tuple[int, WireState], int] = {}
+
+    def column_transitions(self, column_index: int, wires: WireState) -> Generator[Tuple[WireState, Tuple[NodeType, ...]], None, None]:
+        """
+        Enumerates the distinct output wire orderings a column can produce from the given input wires,
+        each with the first node types (in NodeType order) that produce it.
+
+        With a cache, the column is solved once for every ordering of the wires (the states of a search
+        are all orderings of its start), and columns with the same pattern up to their colors
+        share that solution, see `ChunkSolutionCache`.
+        """
+        if self.cache is not None:
+            yield from self._cached_column_transitions(column_index, wires)
+            return
+        chunk = self.chunks[column_index]
+
+        # per node, its admissible node types grouped by the output wires they lead to,
+        # looked up in `encoding.TRANSITIONS` while both wire colors fit its 4 bits
+        node_options = []
+        for i, color in enumerate(chunk.colors):
+            left_index, right_index = chunk.input_wire_indice_for_node(i)
+            left, right = wires[left_index], wires[right_index]
+            options = {}
+            if left < WIRE_COLOR_COUNT and right < WIRE_COLOR_COUNT:
+                pair = (right << WIRE_COLOR_BITS) | left
+                for code, node_type in enumerate(NODE_TYPES):
+                    entry = TRANSITIONS[(code << 8) | pair]
+                    if entry & WIRE_COLOR_MASK == color:
+                        options.setdefault(((entry >> 4) & WIRE_COLOR_MASK, entry >> 8), node_type)
+            else:
+                for node_type in NODE_TYPES:
+                    node_color, output_wires = node_type.compute_output(left, right)
+                    if node_color == color:
+                        options.setdefault(output_wires, node_type)
+            if not options:
+                return
+            node_options.append(list(options.items()))
+
+        for combination in itertools.product(*node_options):
+            output = list(wires)
+            for i, (output_wires, _) in enumerate(combination):
+                left_index, right_index = chunk.input_wire_indice_for_node(i)
+                output[left_index], output[right_index] = output_wires
+            yield tuple(output), tuple(node_type for _, node_type in combination)
+
+    def _cached_column_transitions(self, column_index: int, wires: WireState) -> List[Tuple[WireState, Tuple[NodeType, ...]]]:
+        multiset = tuple(sorted(collections.Counter(wires).items()))
+        key = (column_index, multiset)
+        table = self.cached_transitions.get(key)
+        if table is None:
+            table = {}
+            chunk = self.chunks[column_index]
+            for inputs, node_types in self.cache.solve(chunk, Assortment(dict(multiset))):
+                output = list(inputs)
+                for i, node_type in enumerate(node_types):
+                    left_index, right_index = chunk.input_wire_indice_for_node(i)
+                    _, (output[left_index], output[right_index]) = node_type.compute_output(inputs[left_index], inputs[right_index])
+                # the first node types of every output, as without a cache
+                table.setdefault(tuple(inputs), {}).setdefault(tuple(output), node_types)
+            table = {inputs: list(outputs.items()) for inputs, outputs in table.items()}
+            self.cached_transitions[key] = table
+        return table.get(wires, [])
+
+    def column_predecessors(self, column_index: int, wires: WireState) -> Generator[Tuple[WireState, Tuple[NodeType, ...]], None, None]:
+        """
+        Enumerates the distinct input wire orderings from which a column lets out the given wires,
+        each with the first node types (in NodeType order) that produce it.
+        The inverse of `column_transitions`.
+        """
+        chunk = self.chunks[column_index]
+
+        # per node, its node types giving the expected color grouped by the input wires they come from
+        node_options = []
+        for i in range(len(chunk.colors)):
+            left_index, right_index = chunk.output_wire_indice_for_node(i)
+            options = {}
+            for node_type in NodeType:
+                node_color, input_wires = node_type.compute_input(wires[left_index], wires[right_index])
+                if node_color == chunk.colors[i]:
+                    options.setdefault(input_wires, node_type)
+            if not options:
+                return
+            node_options.append(list(options.items()))
+
+        for combination in itertools.product(*node_options):
+            inputs = list(wires)
+            for i, (input_wires, _) in enumerate(combination):
+                left_index, right_index = chunk.input_wire_indice_for_node(i)
+                inputs[left_index], inputs[right_index] = input_wires
+            yield tuple(inputs), tuple(node_type for _, node_type in combination)
+
+    def starting_states(self, assortment: Optional[Assortment] = None) -> Generator[WireState, None, None]:
+        """
+        Generates the candidate wire orderings entering the first column,
+        none when the assortment takes more wires than the bracelet has.
+
+        :param assortment: Wire assortment to draw the orderings from, defaults to `BData.wire_assortment`
+        """
+        if assortment is None:
+            assortment = self.bdata.wire_assortment()
+        if not self.bdata.validate_assortment(assortment):
+            # the design can not be knotted with its wires
+            return
+        for valid_input in assortment.generate_valid_inputs(max_wire_count=self.bdata.wireCount):
+            yield tuple(valid_input)
+
+    def iter_solutions(self, start_wires: Optional[Iterable[int]] = None,
+                       assortment: Optional[Assortment] = None,
+                       column_count: Optional[int] = None,
+                       cyclic: bool = False) -> Generator[Tuple[List[int], NodeTypeGrid], None, None]:
+        """
+        Enumerates the solutions of the bracelet.
+
+        :param start_wires: Wire colors entering the first column, all valid inputs of the assortment if None
+        :param assortment: Wire assortment used when `start_wires` is None
+        :param column_count: Only solve the first `column_count` columns
+        :param cyclic: Only keep solutions whose wires leave the last solved column in their starting order
+        :return: A generator of (starting wire colors, node types of every column)
+        """
+        if start_wires is not None:
+            states = [tuple(start_wires)]
+        else:
+            states = self.starting_states(assortment)
+
+        for state in states:
+            goal = None
+            goal_dead_states = None
+            if cyclic:
+                # states that reach the horizon but miss the goal only hold for this start
+                goal = state
+                goal_dead_states = set()
+            for grid in self._search(state, column_count, goal, goal_dead_states):
+                yield list(state), grid
+
+    def solve(self, start_wires: Optional[Iterable[int]] = None,
+              assortment: Optional[Assortment] = None) -> Optional[Tuple[List[int], NodeTypeGrid]]:
+        """
+        Returns the first solution of the bracelet, or None if it cannot be knotted.
+        See `iter_solutions`.
+        """
+        return next(self.iter_solutions(start_wires, assortment), None)
+
+    def solve_periodic(self, start_wires: Optional[Iterable[int]] = None,
+                       assortment: Optional[Assortment] = None,
+                       max_cycle_periods: int = 4) -> Optional[Tuple[List[int], NodeTypeGrid]]:
+        """
+        Solves the bracelet by solving only one repeat of its pattern, see `BData.column_period`.
+
+        The node types of a repeat can be tiled along the bracelet only if the wires come out of it
+        in their starting order, so the search looks for such a wire-state cycle over 1, 2, ...
+        `max_cycle_periods` repeats, and falls back to `solve` when the pattern has none.
+        See `iter_solutions`.
+        """
+        period = self.bdata.column_period()
+        for repeats in range(1, max_cycle_periods + 1):
+            cycle = period * repeats
+            if cycle >= self.bdata.colCount:
+                break
+            solution = next(self.iter_solutions(start_wires, assortment, column_count=cycle, cyclic=True), None)
+            if solution is not None:
+                start, grid = solution
+                return start, [grid[column_index % cycle] for column_index in range(self.bdata.colCount)]
+        return self.solve(start_wires, assortment)
+
+    def solve_bidirectional(self, start_wires: Optional[Iterable[int]] = None,
+                            end_wires: Optional[Iterable[int]] = None,
+                            assortment: Optional[Assortment] = None) -> Optional[Tuple[List[int], NodeTypeGrid]]:
+        """
+        Solves the bracelet by meet in the middle, suited to long bracelets with constrained ends.
+
+        The set of wire orderings reachable from the start is expanded forward column by column
+        (`column_transitions`), and the set of orderings leading to the end backward
+        (`column_predecessors`), always expanding the smaller of the two frontiers.
+        Orderings reached by several paths are kept once. When both sides cover every column,
+        the two frontiers are joined on their common orderings.
+
+        An unconstrained end is never enumerated: the search only goes forward. An unconstrained start
+        is not either: the search only goes backward, and the orderings reaching the first column are
+        tested against the assortment (`Assortment.is_valid_input`). With neither end constrained
+        there is nothing to meet, and the depth first `solve` streams the starting states instead.
+
+        :param start_wires: Wire colors entering the first column, any valid input of the assortment if None
+        :param end_wires: Wire colors leaving the last column, any ordering if None
+        :param assortment: Wire assortment used when `start_wires` is None, defaults to `BData.wire_assortment`
+        :return: (starting wire colors, node types of every column), or None if the bracelet cannot be knotted
+        """
+        if start_wires is None and end_wires is None:
+            return self.solve(assortment=assortment)
+        if assortment is None:
+            assortment = self.bdata.wire_assortment()
+
+        # forward[k] : orderings entering column k -> (ordering entering column k - 1, node types of column k - 1)
+        # backward[k] : orderings entering column colCount - k -> (ordering entering the next column, node types)
+        # an unconstrained side stays [None]
+        forward: List[Optional[Dict[WireState, Any]]] = [dict.fromkeys([tuple(start_wires)])] if start_wires is not None else [None]
+        backward: List[Optional[Dict[WireState, Any]]] = [dict.fromkeys([tuple(end_wires)])] if end_wires is not None else [None]
+        while len(forward) + len(backward) - 2 < self.bdata.colCount:
+            frontier = {}
+            if backward[-1] is None or (forward[-1] is not None and len(forward[-1]) <= len(backward[-1])):
+                column_index = len(forward) - 1
+                for state in forward[-1]:
+                    for output, node_types in self.column_transitions(column_index, state):
+                        frontier.setdefault(output, (state, node_types))
+                forward.append(frontier)
+            else:
+                column_index = self.bdata.colCount - len(backward)
+                for state in backward[-1]:
+                    for inputs, node_types in self.column_predecessors(column_index, state):
+                        frontier.setdefault(inputs, (state, node_types))
+                backward.append(frontier)
+            if not frontier:
+                return None
+
+        # hash join of the two frontiers, which now enter the same column
+        if forward[-1] is None:
+            meeting = next((state for state in backward[-1] if assortment.is_valid_input(state, self.bdata.wireCount)), None)
+        else:
+            meeting = next((state for state in forward[-1] if backward[-1] is None or state in backward[-1]), None)
+        if meeting is None:
+            return None
+
+        grid: NodeTypeGrid = []
+        state = meeting
+        for layer in reversed(forward[1:]):
+            state, node_types = layer[state]
+            grid.append(node_types)
+        grid.reverse()
+        start = state
+
+        state = meeting
+        for layer in reversed(backward[1:]):
+            state, node_types = layer[state]
+            grid.append(node_types)
+        return list(start), grid
+
+    def _search(self, start: WireState, column_count: Optional[int],
+                goal: Optional[WireState] = None,
+                goal_dead_states: Optional[Set[Tuple[int, WireState]]] = None) -> Generator[NodeTypeGrid, None, None]:
+        # iterative depth first search, a bracelet can be longer than the recursion limit
+        column_count = self.bdata.colCount if column_count is None else column_count
+        if column_count == 0:
+            if goal is None or goal == start:
+                yield []
+            return
+        dead_states = self.dead_states
+        horizon = dead_states.get((0, start))
+        if horizon is not None and horizon <= column_count:
+            return
+        if goal_dead_states is not None and (0, start) in goal_dead_states:
+            return
+
+        # one frame per column:
+        # [input wires, transitions left to explore, the horizon was reached below, a solution was found below]
+        stack = [[start, self.column_transitions(0, start), False, False]]
+        path: NodeTypeGrid = []
+        while stack:
+            frame = stack[-1]
+            column_index = len(stack) - 1
+            transition = next(frame[1], None)
+            if transition is None:
+                stack.pop()
+                if path:
+                    path.pop()
+                key = (column_index, frame[0])
+                if not frame[2]:
+                    dead_states[key] = min(dead_states.get(key, column_count), column_count)
+                elif not frame[3] and goal_dead_states is not None:
+                    goal_dead_states.add(key)
+                continue
+
+            output, node_types = transition
+            if column_index + 1 == column_count:
+                for visited in stack:
+                    visited[2] = True
+                if goal is not None and output != goal:
+                    continue
+                for visited in stack:
+                    visited[3] = True
+                yield path + [node_types]
+                continue
+            key = (column_index + 1, output)
+            horizon = dead_states.get(key)
+            if horizon is not None and horizon <= column_count:
+                continue
+            if goal_dead_states is not None and key in goal_dead_states:
+                # that state did reach the horizon, only missing the goal
+                for visited in stack:
+                    visited[2] = True
+                continue
+
+            path.append(node_types)
+            stack.append([output, self.column_transitions(column_index + 1, output), False, False])
+
+    def replay(self, start_wires: Iterable[int], grid: NodeTypeGrid) -> List[List[int]]:
+        """
+        Knots the bracelet from the given starting wires and node types, and returns
+        the resulting node colors of every column.
+        """
+        colors, _ = simulate(encode_grid(grid, self.bdata.wireCount), list(start_wires))
+        return [colors[column_index, :len(node_types)].tolist() for column_index, node_types in enumerate(grid)]
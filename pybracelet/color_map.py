@@ -1,3 +1,8 @@
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+
 
 COLOR_MAP ={
         'alice blue': '#F0F8FF',
@@ -650,4 +655,82 @@ COLOR_MAP ={
         'yellow3': '#CDCD00',
         'yellow4': '#8B8B00',
         'YellowGreen': '#9ACD32',
-    }
\ No newline at end of file
+    }
+
+
+# deduplicated palette of COLOR_MAP, built on first lookup: (names, hex colors, RGB array, Lab array)
+_PALETTE: Optional[Tuple[List[str], List[str], np.ndarray, np.ndarray]] = None
+
+
+def hex_to_rgb(colors: Iterable[str]) -> np.ndarray:
+    """
+    Parses '#RRGGBB' colors, or names of COLOR_MAP, into an (N, 3) uint8 array.
+    """
+    values = [int(COLOR_MAP.get(color, color).lstrip("#"), 16) for color in colors]
+    packed = np.array(values, dtype=np.uint32).reshape(-1, 1)
+    return ((packed >> np.array([16, 8, 0], dtype=np.uint32)) & 0xFF).astype(np.uint8)
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """
+    Converts sRGB colors (0 to 255, any shape ending with 3) to CIE Lab under the D65 white point.
+    """
+    rgb = np.asarray(rgb, dtype=np.float64) / 255
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055)**2.4, rgb / 12.92)
+    xyz = linear @ np.array([[0.4124, 0.2126, 0.0193],
+                             [0.3576, 0.7152, 0.1192],
+                             [0.1805, 0.0722, 0.9505]])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > (6 / 29)**3, np.cbrt(xyz), xyz / (3 * (6 / 29)**2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def _palette() -> Tuple[List[str], List[str], np.ndarray, np.ndarray]:
+    global _PALETTE
+    if _PALETTE is None:
+        # first name of every distinct color
+        by_hex = {}
+        for name, color in COLOR_MAP.items():
+            by_hex.setdefault(color.upper(), name)
+        hexes = list(by_hex)
+        rgb = hex_to_rgb(hexes)
+        _PALETTE = list(by_hex.values()), hexes, rgb, rgb_to_lab(rgb)
+    return _PALETTE
+
+
+def nearest_named_colors(colors: Union[Iterable[str], np.ndarray], space: str = "lab",
+                         chunk_size: int = 4096) -> List[Tuple[str, str]]:
+    """
+    Snaps colors to the nearest distinct color of COLOR_MAP.
+
+    :param colors: '#RRGGBB' colors, or an (N, 3) array of RGB values
+    :param space: "lab" to compare colors perceptually, "rgb" for plain RGB distances
+    :param chunk_size: Number of colors compared to the palette at once, bounds the memory used
+    :return: (name, '#RRGGBB') of the nearest named color, for every color
+    """
+    names, hexes, palette_rgb, palette_lab = _palette()
+    if isinstance(colors, np.ndarray):
+        rgb = colors.reshape(-1, 3)
+    else:
+        rgb = hex_to_rgb(colors)
+    if space == "lab":
+        queries, palette = rgb_to_lab(rgb), palette_lab
+    elif space == "rgb":
+        queries, palette = rgb.astype(np.float64), palette_rgb.astype(np.float64)
+    else:
+        raise ValueError(f"Unknown color space {space!r}")
+
+    palette_norms = (palette**2).sum(axis=1)
+    nearest = np.empty(len(queries), dtype=np.int64)
+    for start in range(0, len(queries), chunk_size):
+        chunk = queries[start:start + chunk_size]
+        # squared distances up to the query norm, which does not change the nearest color
+        nearest[start:start + chunk_size] = (palette_norms[None, :] - 2 * chunk @ palette.T).argmin(axis=1)
+    return [(names[i], hexes[i]) for i in nearest.tolist()]
+
+
+def nearest_named_color(color: str, space: str = "lab") -> Tuple[str, str]:
+    """
+    Returns the (name, '#RRGGBB') of the color of COLOR_MAP nearest to a '#RRGGBB' color.
+    """
+    return nearest_named_colors([color], space=space)[0]
@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+def color_uindex(colors: Iterable[int]) -> Tuple[Tuple[int, ...], Dict[int, int]]:
+    """
+    Relabels the colors of a column by order of first appearance, see `solver.colorIndexor_inapply`.
+
+    :param colors: Color indices of the column, sorted by row index
+    :return: The universal color index of every node (ucc), and the color -> universal index mapping
+    """
+    mapping: Dict[int, int] = {}
+    ucc = []
+    for color in colors:
+        if color not in mapping:
+            mapping[color] = len(mapping)
+        ucc.append(mapping[color])
+    return tuple(ucc), mapping
+
+
+def assortment_uindex(assortment: Dict[int, int], mapping: Dict[int, int]) -> Dict[int, int]:
+    """
+    Extends a column's color -> universal index mapping to every color of a wire assortment.
+
+    Colors absent from the column only matter through their counts, so they are labelled
+    after the column colors by decreasing count, and equal assortments up to relabelling map together.
+    """
+    mapping = dict(mapping)
+    others: List[Tuple[int, int]] = sorted((-count, color) for color, count in assortment.items() if color not in mapping)
+    for _, color in others:
+        mapping[color] = len(mapping)
+    return mapping
+
+
+def column_histograms(colors: np.ndarray, mask: np.ndarray, color_count: int = 0) -> np.ndarray:
+    """
+    Returns the color histogram of every column of a dense node array, see `NodeGrid.color_histograms`.
+
+    :param colors: (colCount, rows) array of color indices
+    :param mask: (colCount, rows) boolean array of the positions holding a node
+    :param color_count: Minimum number of colors in the histograms
+    :return: (colCount, C) array of counts
+    """
+    colidx = np.nonzero(mask)[0]
+    values = colors[mask].astype(np.int64)
+    width = max(color_count, int(values.max()) + 1 if values.size else 0)
+    counts = np.bincount(colidx * width + values, minlength=colors.shape[0] * width)
+    return counts.reshape(colors.shape[0], width)
+
+
+def minimal_distribution(colors: np.ndarray, mask: np.ndarray, color_count: int = 0) -> Tuple[int, Dict[int, int]]:
+    """
+    Returns the highest count of every color in a single column, and the number of wires it takes.
+
+    :return: minimum wire count, color -> count
+    """
+    histograms = column_histograms(colors, mask, color_count)
+    maximums = histograms.max(axis=0) if histograms.shape[0] else np.zeros(histograms.shape[1], dtype=np.int64)
+    minimal = {color: int(count) for color, count in enumerate(maximums.tolist())}
+    return sum(minimal.values()), minimal
+
+
+def color_uindex_table(colors: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Relabels the colors of every column by order of first appearance, `color_uindex` over a whole dense node array.
+
+    :return: colidx, cidx and ucidx of every distinct (column, color), sorted by column then color,
+             and for every node (in mask order) its entry in those arrays
+    """
+    colidx = np.nonzero(mask)[0]
+    values = colors[mask].astype(np.int64)
+    width = int(values.max()) + 1 if values.size else 1
+    keys, first, inverse = np.unique(colidx * width + values, return_index=True, return_inverse=True)
+
+    key_cols = keys // width
+    # nodes are in column then row order, so the first index orders colors by first appearance
+    order = np.lexsort((first, key_cols))
+    group_start = np.searchsorted(key_cols[order], key_cols[order], side="left")
+    ucidx = np.empty(len(keys), dtype=np.int64)
+    ucidx[order] = np.arange(len(keys)) - group_start
+    return key_cols, keys % width, ucidx, inverse.reshape(-1)
+
+
+def color_uindex_grid(colors: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Returns the universal color index of every node of a dense node array, 0 outside of the mask.
+    """
+    _, _, ucidx, inverse = color_uindex_table(colors, mask)
+    grid = np.zeros(colors.shape, dtype=np.int64)
+    grid[mask] = ucidx[inverse]
+    return grid
+
+
+def color_constraints(colors: np.ndarray, mask: np.ndarray) -> List[bytes]:
+    """
+    Returns the color constraint (ucc) of every column as hashable bytes, one byte per node.
+    Columns with the same pattern up to a renaming of their colors get equal constraints.
+    """
+    packed = color_uindex_grid(colors, mask).astype(np.uint8)
+    node_counts = mask.sum(axis=1).tolist()
+    return [packed[colidx, :node_count].tobytes() for colidx, node_count in enumerate(node_counts)]
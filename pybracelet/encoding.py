@@ -0,0 +1,113 @@
+from typing import Iterable, List, Tuple
+
+
+# Bit-packed encoding of node types and wire colors.
+# A node type takes 2 bits (its NodeType value), a wire color 4 bits (color indices 0 to 15).
+# Node i of a column sits at bits [2i, 2i+2) of a packed column, wire i at bits [4i, 4i+4) of a packed wire state.
+NODE_TYPE_BITS = 2
+WIRE_COLOR_BITS = 4
+NODE_TYPE_MASK = (1 << NODE_TYPE_BITS) - 1
+WIRE_COLOR_MASK = (1 << WIRE_COLOR_BITS) - 1
+WIRE_COLOR_COUNT = 1 << WIRE_COLOR_BITS
+
+# rule of every node type, by NodeType value: (the node takes the right wire color, the node swaps its wires)
+NODE_RULES: Tuple[Tuple[bool, bool], ...] = (
+    (True, True),    # LL
+    (False, True),   # RR
+    (True, False),   # LR
+    (False, True),   # RL
+)
+
+
+def apply_rule(code: int, left_color: int, right_color: int) -> Tuple[int, Tuple[int, int]]:
+    """
+    Returns the node color and the output wires (left, right) of a node type code.
+    """
+    takes_right, swaps = NODE_RULES[code]
+    node_color = right_color if takes_right else left_color
+    return node_color, ((right_color, left_color) if swaps else (left_color, right_color))
+
+
+def invert_rule(code: int, left_output: int, right_output: int) -> Tuple[int, Tuple[int, int]]:
+    """
+    Returns the node color and the input wires (left, right) of a node type code
+    from the wires it lets out, the inverse of `apply_rule`.
+    """
+    takes_right, swaps = NODE_RULES[code]
+    left_color, right_color = (right_output, left_output) if swaps else (left_output, right_output)
+    return (right_color if takes_right else left_color), (left_color, right_color)
+
+
+def _build_transitions() -> List[int]:
+    transitions = []
+    for code in range(len(NODE_RULES)):
+        for right_color in range(WIRE_COLOR_COUNT):
+            for left_color in range(WIRE_COLOR_COUNT):
+                node_color, (out_left, out_right) = apply_rule(code, left_color, right_color)
+                transitions.append(node_color | (out_left << 4) | (out_right << 8))
+    return transitions
+
+
+# TRANSITIONS[(code << 8) | (right << 4) | left] = node_color | (out_left << 4) | (out_right << 8),
+# so that the input index of a node is the byte holding its two wires in a packed wire state,
+# and the bits 4 to 12 of the entry are the byte holding its output wires
+TRANSITIONS: List[int] = _build_transitions()
+
+
+def pack_node_types(codes: Iterable[int]) -> int:
+    """
+    Packs the node type codes (or NodeTypes) of a column into a single integer.
+    """
+    packed = 0
+    for i, code in enumerate(codes):
+        packed |= int(getattr(code, "value", code)) << (NODE_TYPE_BITS * i)
+    return packed
+
+
+def unpack_node_types(packed: int, node_count: int) -> List[int]:
+    """
+    Returns the node type codes of a packed column.
+    """
+    return [(packed >> (NODE_TYPE_BITS * i)) & NODE_TYPE_MASK for i in range(node_count)]
+
+
+def pack_wires(colors: Iterable[int]) -> int:
+    """
+    Packs wire colors into a single integer.
+
+    :raises ValueError: If a color index does not fit in 4 bits
+    """
+    packed = 0
+    for i, color in enumerate(colors):
+        if not 0 <= color < WIRE_COLOR_COUNT:
+            raise ValueError(f"Color index {color} does not fit in {WIRE_COLOR_BITS} bits")
+        packed |= color << (WIRE_COLOR_BITS * i)
+    return packed
+
+
+def unpack_wires(packed: int, wire_count: int) -> List[int]:
+    """
+    Returns the wire colors of a packed wire state.
+    """
+    return [(packed >> (WIRE_COLOR_BITS * i)) & WIRE_COLOR_MASK for i in range(wire_count)]
+
+
+def step_column(node_types: int, wires: int, node_count: int, even: bool) -> Tuple[int, int]:
+    """
+    Knots a column with table lookups, `BChunk.compute_output` on packed values.
+
+    :param node_types: Packed node types of the column
+    :param wires: Packed input wire colors
+    :param node_count: Number of nodes in the column
+    :param even: True for an even column, where node i knots wires (2i, 2i+1)
+    :return: packed node colors (4 bits per node), packed output wire colors
+    """
+    node_colors = 0
+    shift = 0 if even else WIRE_COLOR_BITS
+    for i in range(node_count):
+        code = (node_types >> (NODE_TYPE_BITS * i)) & NODE_TYPE_MASK
+        entry = TRANSITIONS[(code << 8) | ((wires >> shift) & 0xFF)]
+        node_colors |= (entry & WIRE_COLOR_MASK) << (WIRE_COLOR_BITS * i)
+        wires = (wires & ~(0xFF << shift)) | ((entry >> 4) << shift)
+        shift += 2 * WIRE_COLOR_BITS
+    return node_colors, wires
@@ -0,0 +1,127 @@
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from pybracelet.BData import BChunk, NodeType
+from pybracelet.encoding import NODE_RULES
+
+
+# node types are encoded as uint8 codes (their NodeType value), candidates as arrays of shape (K, N)
+NODE_TYPES: List[NodeType] = [NodeType(code) for code in range(len(NodeType))]
+
+
+# COLOR_FROM_RIGHT[code] : the node takes the color of its right input wire
+# OUTPUT_SWAPPED[code] : the node exchanges its two wires
+COLOR_FROM_RIGHT = np.array([takes_right for takes_right, _ in NODE_RULES], dtype=bool)
+OUTPUT_SWAPPED = np.array([swaps for _, swaps in NODE_RULES], dtype=bool)
+
+
+def encode_node_types(node_types: Iterable[Sequence[NodeType]]) -> np.ndarray:
+    """
+    Encodes candidate node type assignments as a uint8 array of shape (K, N).
+    """
+    return np.array([[node_type.value for node_type in candidate] for candidate in node_types], dtype=np.uint8)
+
+
+def decode_node_types(codes: np.ndarray) -> List[Tuple[NodeType, ...]]:
+    """
+    Decodes a uint8 array of shape (K, N) back into tuples of NodeType.
+    """
+    return [tuple(NODE_TYPES[code] for code in candidate) for candidate in np.asarray(codes).tolist()]
+
+
+def enumerate_node_type_codes(node_count: int) -> np.ndarray:
+    """
+    Returns every node type assignment for `node_count` nodes as a (4**node_count, node_count)
+    uint8 array, in the same order as `BChunk.enumerate_possible_nodetypes`.
+    """
+    # node i varies along axis i of a (4,) * node_count grid, broadcast straight into uint8
+    codes = np.empty((len(NODE_TYPES),) * node_count + (node_count,), dtype=np.uint8)
+    for node_index in range(node_count):
+        shape = [1] * node_count
+        shape[node_index] = len(NODE_TYPES)
+        codes[..., node_index] = np.arange(len(NODE_TYPES), dtype=np.uint8).reshape(shape)
+    return codes.reshape(len(NODE_TYPES) ** node_count, node_count)
+
+
+def wire_indices(node_count: int, even: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the left and right input wire indices of every node of a column,
+    see `BChunk.input_wire_indice_for_node`.
+    """
+    left = 2 * np.arange(node_count) + (0 if even else 1)
+    return left, left + 1
+
+
+def wire_array(wire_colors: Sequence[int]) -> np.ndarray:
+    """
+    Returns wire colors as the smallest unsigned array that holds them, uint8 for any realistic palette.
+    """
+    wire_colors = np.asarray(wire_colors)
+    if wire_colors.size and wire_colors.min() >= 0:
+        return wire_colors.astype(np.min_scalar_type(wire_colors.max()))
+    return wire_colors
+
+
+def evaluate_node_types(node_types: np.ndarray, input_wires: np.ndarray, even: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the node colors and output wires of K candidate node type assignments at once.
+
+    :param node_types: uint8 array of shape (K, N) of node type codes
+    :param input_wires: int array of shape (W,) shared by all candidates, or (K, W)
+    :param even: True for an even column, where node i knots wires (2i, 2i+1)
+    :return: node colors of shape (K, N) and output wires of shape (K, W)
+    """
+    node_types = np.asarray(node_types, dtype=np.uint8)
+    input_wires = np.asarray(input_wires)
+    candidate_count, node_count = node_types.shape
+    wire_count = input_wires.shape[-1]
+
+    # strided views rather than fancy indexing, see `wire_indices`
+    first = 0 if even else 1
+    last = first + 2 * node_count
+    left = input_wires[..., first:last:2]
+    right = input_wires[..., first + 1:last:2]
+
+    output_wires = np.empty((candidate_count, wire_count), dtype=input_wires.dtype)
+    # untouched wires (the outer wires of odd columns) pass through
+    output_wires[:, :first] = input_wires[..., :first]
+    output_wires[:, last:] = input_wires[..., last:]
+
+    if input_wires.ndim == 1:
+        # shared inputs: per node tables of the 4 node types, gathered by (node, code)
+        color_table = np.where(COLOR_FROM_RIGHT[None, :], right[:, None], left[:, None])
+        pair_table = np.empty((node_count, len(NODE_TYPES), 2), dtype=input_wires.dtype)
+        pair_table[:, :, 0] = np.where(OUTPUT_SWAPPED[None, :], right[:, None], left[:, None])
+        pair_table[:, :, 1] = np.where(OUTPUT_SWAPPED[None, :], left[:, None], right[:, None])
+        index = node_types + (len(NODE_TYPES) * np.arange(node_count, dtype=np.min_scalar_type(len(NODE_TYPES) * node_count)))
+        node_colors = np.take(color_table.ravel(), index)
+        output_wires[:, first:last] = np.take(pair_table.reshape(-1, 2), index, axis=0).reshape(candidate_count, -1)
+        return node_colors, output_wires
+
+    swapped = OUTPUT_SWAPPED[node_types]
+    node_colors = np.where(COLOR_FROM_RIGHT[node_types], right, left)
+
+    output_wires[:, first:last:2] = np.where(swapped, right, left)
+    output_wires[:, first + 1:last:2] = np.where(swapped, left, right)
+    return node_colors, output_wires
+
+
+def evaluate_chunk(chunk: BChunk, node_types: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched `BChunk.compute_output`: evaluates K candidates against the chunk's input wires.
+
+    :param chunk: The chunk, with its input wire colors set
+    :param node_types: uint8 array of shape (K, N) of node type codes
+    :return: node colors of shape (K, N) and output wires of shape (K, W)
+    """
+    return evaluate_node_types(node_types, wire_array(chunk.input_wire_colors), chunk.is_even_column())
+
+
+def matching_candidates(chunk: BChunk, node_types: np.ndarray) -> np.ndarray:
+    """
+    Batched `BChunk.check_and_compute_output`: returns a boolean mask of shape (K,)
+    selecting the candidates that reproduce the chunk's colors.
+    """
+    node_colors, _ = evaluate_chunk(chunk, node_types)
+    return np.all(node_colors == np.asarray(chunk.colors), axis=1)
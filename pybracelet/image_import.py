@@ -0,0 +1,136 @@
+import sys
+from typing import Optional, Tuple
+
+import numpy as np
+
+from pybracelet.BData import BData
+from pybracelet.palette import color_costs, fit_wire_count
+
+
+def _image_array(image) -> np.ndarray:
+    # an (H, W, 3) RGB array from an array, a PIL image or a file path
+    if isinstance(image, str):
+        from PIL import Image
+        with Image.open(image) as opened:
+            image = np.asarray(opened.convert("RGB"))
+    # a PIL image can only exist once PIL is imported, palette, CMYK or LA images need a conversion
+    pil_image = sys.modules.get("PIL.Image")
+    if pil_image is not None and isinstance(image, pil_image.Image):
+        image = image.convert("RGB")
+    image = np.asarray(image)
+    if image.ndim == 2:
+        image = np.repeat(image[:, :, None], 3, axis=2)
+    return image[:, :, :3]
+
+
+def default_col_count(image_shape: Tuple[int, ...], wireCount: int) -> int:
+    """
+    Returns the number of columns that keeps the aspect ratio of an image of the given shape.
+    Columns are half a node apart, rows a whole node, see `BData.findNode`.
+    """
+    height, width = image_shape[:2]
+    return max(round(width / height * (2 * (wireCount // 2) + 1)) - 1, 1)
+
+
+def sample_nodes(image, wireCount: int, colCount: int) -> np.ndarray:
+    """
+    Samples an image at the node centers of a bracelet stretched over it.
+
+    Node centers sit on the checkerboard lattice of `BData.findNode`: column c at x = c + 1,
+    row r at y = 2r + 1 (2r + 2 in odd columns), in half node steps from the bottom left.
+    Only the pixels under node centers are read, whatever the size of the image.
+
+    :param image: RGB(A) or grey image, as an array, a PIL image or a file path
+    :return: (colCount, wireCount // 2, 3) float array of node colors, laid out as `NodeGrid.colors`;
+             the last row of odd columns holds the pixel below the column's last node
+    """
+    image = _image_array(image)
+    height, width = image.shape[:2]
+    rowCount = wireCount // 2
+
+    colidx = np.arange(colCount)[:, None]
+    rowidx = np.arange(rowCount)[None, :]
+    x = (colidx + 1) / (colCount + 1) * width
+    y = (2 * rowidx + 1 + colidx % 2) / (2 * rowCount + 1) * height
+    # bracelet rows go up, image rows go down, as in `render.render_array`
+    pixel_cols = np.clip(x.astype(np.int64), 0, width - 1)
+    pixel_rows = np.clip(height - 1 - y.astype(np.int64), 0, height - 1)
+    return image[pixel_rows, np.broadcast_to(pixel_cols, pixel_rows.shape)].astype(np.float64)
+
+
+def kmeans_colors(samples: np.ndarray, color_count: int, batch_size: int = 1024, iterations: int = 50,
+                  rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clusters colors with mini-batch k-means, seeded with k-means++.
+
+    :param samples: (S, 3) float array of colors
+    :param color_count: Number of clusters, reduced to the number of distinct samples
+    :param batch_size: Number of samples drawn at every iteration
+    :param iterations: Number of mini-batch updates
+    :return: (S,) labels and (K, 3) centroids
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    samples = np.asarray(samples, dtype=np.float64)
+    color_count = min(color_count, len(np.unique(samples, axis=0)))
+
+    # k-means++ seeding
+    centroids = np.empty((color_count, samples.shape[1]))
+    centroids[0] = samples[rng.integers(len(samples))]
+    distances = ((samples - centroids[0])**2).sum(axis=1)
+    for k in range(1, color_count):
+        centroids[k] = samples[rng.choice(len(samples), p=distances / distances.sum())]
+        distances = np.minimum(distances, ((samples - centroids[k])**2).sum(axis=1))
+
+    # mini-batch updates with per-centroid learning rates
+    counts = np.zeros(color_count)
+    for _ in range(iterations):
+        batch = samples[rng.integers(len(samples), size=min(batch_size, len(samples)))]
+        labels = _nearest(batch, centroids)
+        batch_counts = np.bincount(labels, minlength=color_count)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, batch)
+        updated = batch_counts > 0
+        counts[updated] += batch_counts[updated]
+        rate = batch_counts[updated] / counts[updated]
+        centroids[updated] += rate[:, None] * (sums[updated] / batch_counts[updated, None] - centroids[updated])
+
+    return _nearest(samples, centroids), centroids
+
+
+def _nearest(samples: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    distances = (samples**2).sum(axis=1)[:, None] - 2 * samples @ centroids.T + (centroids**2).sum(axis=1)[None, :]
+    return distances.argmin(axis=1)
+
+
+def image_to_bdata(image, wireCount: int, colCount: Optional[int] = None, color_count: int = 6,
+                   masterScale: int = 64, fit_wires: bool = True,
+                   rng: Optional[np.random.Generator] = None) -> BData:
+    """
+    Builds a bracelet from an image: the image is sampled at the node centers (`sample_nodes`)
+    and the sampled colors are quantized (`kmeans_colors`) into the color registry.
+    Nodes then get the closest quantized colors that keep the wire assortment within
+    `wireCount` (`palette.fit_wire_count`), so the design can be knotted with its wires.
+
+    :param image: RGB(A) or grey image, as an array, a PIL image or a file path
+    :param wireCount: Number of wires of the bracelet
+    :param colCount: Number of columns, defaults to the image's aspect ratio (`default_col_count`)
+    :param color_count: Number of colors of the bracelet
+    :param masterScale: Scale factor of the bracelet
+    :param fit_wires: Fit the wire assortment to `wireCount`, otherwise every node gets its closest color
+    :return: BData instance, its color registry holds exactly the quantized colors
+    """
+    image = _image_array(image)
+    if colCount is None:
+        colCount = default_col_count(image.shape, wireCount)
+
+    bdata = BData(wireCount=wireCount, colCount=colCount, masterScale=masterScale)
+    samples = sample_nodes(image, wireCount, colCount)
+    labels, centroids = kmeans_colors(samples[bdata.nodes.mask], color_count, rng=rng)
+
+    if fit_wires:
+        bdata.nodes.colors[:], _ = fit_wire_count(color_costs(samples, centroids), bdata.nodes.mask, wireCount)
+    else:
+        bdata.nodes.colors[bdata.nodes.mask] = labels
+    rgb = np.clip(np.rint(centroids), 0, 255).astype(np.int64)
+    bdata.colorRegistry = {k: "#{:02X}{:02X}{:02X}".format(*color) for k, color in enumerate(rgb.tolist())}
+    return bdata
@@ -0,0 +1,219 @@
+import concurrent.futures
+import hashlib
+import io
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pybracelet import bformat
+from pybracelet.BData import BData
+
+
+INDEX_FILENAME = ".pybracelet-index.json"
+DESIGN_EXTENSIONS = (".json", ".brcl")
+
+
+def load_design(path: str) -> BData:
+    """
+    Loads a design from a JSON file written by `BData.toJson`, or a binary file written by `bformat.save`.
+    """
+    if path.endswith(".brcl"):
+        return bformat.load(path)
+    with open(path, "r") as fin:
+        return BData.fromJsonFile(fin)
+
+
+def _parse_design(path: str, content: bytes) -> BData:
+    if path.endswith(".brcl"):
+        return bformat.loads(content)
+    return BData.fromJsonFile(io.StringIO(content.decode("utf-8")))
+
+
+def design_metadata(bdata: BData) -> Dict[str, Any]:
+    """
+    Returns the metadata of a design stored in the library index.
+    """
+    used = sorted(set(bdata.nodes.values()))
+    return {
+        "wireCount": int(bdata.wireCount),
+        "colCount": int(bdata.colCount),
+        "wire_assortment": {str(k): v for k, v in bdata.wire_assortment().items()},
+        "colors": {str(k): bdata.colorRegistry.get(k) for k in used},
+    }
+
+
+class DesignLibrary():
+    """
+    A directory of saved designs, with a persistent index of their metadata.
+
+    The index is kept in the directory and answers lookups and filters without parsing the designs.
+    Scans are incremental: a design is only parsed again when its size or mtime changed
+    and its content hash no longer matches the index.
+    """
+
+    def __init__(self, root: str, index_path: Optional[str] = None):
+        """
+        :param root: Directory holding the designs, searched recursively
+        :param index_path: File holding the index, defaults to INDEX_FILENAME in `root`
+        """
+        self.root = root
+        self.index_path = index_path if index_path is not None else os.path.join(root, INDEX_FILENAME)
+        # relative path -> metadata
+        self.index: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r") as fin:
+                self.index = json.load(fin)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index.items())
+
+    def path(self, name: str) -> str:
+        """
+        Returns the full path of a design from its name in the index.
+        """
+        return os.path.join(self.root, name)
+
+    def _design_files(self) -> Iterable[str]:
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(DESIGN_EXTENSIONS) and filename != INDEX_FILENAME:
+                    yield os.path.relpath(os.path.join(dirpath, filename), self.root)
+
+    def scan(self) -> List[str]:
+        """
+        Brings the index up to date with the directory, and saves it.
+
+        :return: The names of the designs that were parsed
+        """
+        parsed = []
+        index = {}
+        for name in sorted(self._design_files()):
+            path = self.path(name)
+            stat = os.stat(path)
+            entry = self.index.get(name)
+            if entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                index[name] = entry
+                continue
+
+            with open(path, "rb") as fin:
+                content = fin.read()
+            digest = hashlib.sha256(content).hexdigest()
+            if entry is None or entry["sha256"] != digest:
+                try:
+                    entry = design_metadata(_parse_design(name, content))
+                except Exception as e:
+                    # one broken design must not keep the others out of the index
+                    entry = {"error": str(e)}
+                parsed.append(name)
+            index[name] = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha256=digest)
+
+        self.index = index
+        self.save()
+        return parsed
+
+    def save(self):
+        """
+        Writes the index to `index_path`.
+        """
+        with open(self.index_path, "w") as fout:
+            json.dump(self.index, fout, indent=1, sort_keys=True)
+
+    def filter(self, wireCount: Optional[int] = None, colCount: Optional[int] = None,
+               colors: Optional[Iterable[str]] = None,
+               predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[str]:
+        """
+        Returns the names of the indexed designs matching every given criterion.
+
+        :param wireCount: Number of wires of the design
+        :param colCount: Number of columns of the design
+        :param colors: Colors (registry values) that must all be used by the design
+        :param predicate: Any other test on the metadata of a design
+        """
+        colors = None if colors is None else {color.upper() for color in colors}
+        names = []
+        for name, entry in self.index.items():
+            if "error" in entry:
+                continue
+            if wireCount is not None and entry["wireCount"] != wireCount:
+                continue
+            if colCount is not None and entry["colCount"] != colCount:
+                continue
+            if colors is not None and not colors <= {color.upper() for color in entry["colors"].values() if color}:
+                continue
+            if predicate is not None and not predicate(entry):
+                continue
+            names.append(name)
+        return names
+
+    def load(self, name: str) -> BData:
+        """
+        Loads a design of the library.
+        """
+        return load_design(self.path(name))
+
+    def batch(self, func: Callable[[BData], Any], names: Optional[Iterable[str]] = None,
+              max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Loads designs and applies a function to each of them, in parallel worker processes.
+
+        :param func: Function of a BData, it must be picklable (defined at module level)
+        :param names: Names of the designs, all indexed designs that parsed if None
+        :param max_workers: Number of worker processes, defaults to the number of CPUs
+        :return: The result of `func` for every design name, or {"error": message} for the designs
+                 that failed to load or whose `func` raised, as `scan` records unparsable designs
+        """
+        names = self._names(names)
+        paths = [self.path(name) for name in names]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(_apply, [func] * len(paths), paths, chunksize=max(len(paths) // 64, 1))
+            return dict(zip(names, results))
+
+    def validate(self, names: Optional[Iterable[str]] = None, max_workers: Optional[int] = None) -> Dict[str, bool]:
+        """
+        Checks that the wire assortment of every design fits its wire count, see `BData.validate_assortment`.
+        Designs that fail to load map to {"error": message}, see `batch`.
+        """
+        return self.batch(_validate, names, max_workers)
+
+    def render(self, output_dir: str, names: Optional[Iterable[str]] = None,
+               masterScale: int = 8, max_workers: Optional[int] = None) -> Dict[str, str]:
+        """
+        Renders PNG previews of designs into `output_dir`, see `render.render`.
+
+        :return: The path of the preview of every design, or {"error": message} when it could not be rendered
+        """
+        names = self._names(names)
+        os.makedirs(output_dir, exist_ok=True)
+        targets = [os.path.join(output_dir, name.replace(os.sep, "__") + ".png") for name in names]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            errors = list(executor.map(_render_to, [self.path(name) for name in names], targets, [masterScale] * len(names)))
+        return {name: target if error is None else error for name, target, error in zip(names, targets, errors)}
+
+    def _names(self, names: Optional[Iterable[str]]) -> List[str]:
+        if names is None:
+            return [name for name, entry in self.index.items() if "error" not in entry]
+        return list(names)
+
+
+def _apply(func: Callable[[BData], Any], path: str) -> Any:
+    # one failing design must not discard the results of the batch
+    try:
+        return func(load_design(path))
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _validate(bdata: BData) -> bool:
+    return bdata.validate_assortment(bdata.wire_assortment())
+
+
+def _render_to(path: str, target: str, masterScale: int) -> Optional[Dict[str, str]]:
+    from pybracelet.render import render
+    try:
+        render(load_design(path), masterScale=masterScale).save(target, format="PNG")
+    except Exception as e:
+        return {"error": str(e)}
+    return None
@@ -0,0 +1,158 @@
+from collections.abc import MutableMapping
+from typing import Iterator, Tuple
+
+import numpy as np
+
+
+class NodeGrid(MutableMapping):
+    """
+    Dense storage of the node colors of a bracelet.
+
+    Colors are held in a (colCount, wireCount // 2) uint8 array; odd columns have one node less,
+    their last row is masked out. The class behaves like the former `dict[(colidx, rowidx)] -> color`,
+    iterating nodes column by column, while columns are available as array views.
+    """
+
+    def __init__(self, colCount: int, wireCount: int):
+        """
+        :param colCount: Number of columns in the bracelet
+        :param wireCount: Number of wires in the bracelet
+        """
+        self.colCount = colCount
+        self.rowCount = wireCount // 2
+        self.colors = np.zeros((colCount, self.rowCount), dtype=np.uint8)
+
+        # odd columns are shifted down by one row, their last row holds no node
+        self.mask = np.ones((colCount, self.rowCount), dtype=bool)
+        if self.rowCount > 0:
+            self.mask[1::2, -1] = False
+
+        # per color histograms, maintained by __setitem__ once built, see `max_color_counts`
+        self._histograms = None
+        # _levels[color, k] : number of columns holding exactly k nodes of that color
+        self._levels = None
+        self._max_counts = None
+
+    def node_count(self, colidx: int) -> int:
+        """
+        Returns the number of nodes in the given column.
+        """
+        return self.rowCount if colidx % 2 == 0 else self.rowCount - 1
+
+    def column(self, colidx: int) -> np.ndarray:
+        """
+        Returns the colors of a column, sorted by row index, as a view on the grid.
+        """
+        return self.colors[colidx, :self.node_count(colidx)]
+
+    def color_histograms(self, color_count: int = 0) -> np.ndarray:
+        """
+        Returns the per column color histograms as a (colCount, C) array, in one pass over the grid.
+
+        :param color_count: Minimum number of colors C, the histograms cover at least every used color
+        """
+        colidx = np.nonzero(self.mask)[0]
+        colors = self.colors[self.mask]
+        width = max(color_count, int(colors.max()) + 1 if colors.size else 0)
+        counts = np.bincount(colidx * width + colors, minlength=self.colCount * width)
+        return counts.reshape(self.colCount, width)
+
+    def max_color_counts(self) -> np.ndarray:
+        """
+        Returns, for every color, the highest number of nodes of that color found in a single column.
+
+        The first call builds the histograms in one pass, later color changes through
+        __setitem__ update them incrementally, so that further calls cost O(colors).
+        Writes made directly to `colors` are not tracked, call `invalidate_histograms` after them.
+        """
+        if self._histograms is None:
+            self._histograms = self.color_histograms()
+            width = self._histograms.shape[1]
+            self._levels = np.zeros((width, self.rowCount + 1), dtype=np.int64)
+            for color in range(width):
+                self._levels[color] = np.bincount(self._histograms[:, color], minlength=self.rowCount + 1)
+            self._max_counts = self._histograms.max(axis=0) if self.colCount else np.zeros(width, dtype=np.int64)
+        return self._max_counts.copy()
+
+    def invalidate_histograms(self):
+        """
+        Drops the tracked histograms, they are rebuilt by the next `max_color_counts`.
+        """
+        self._histograms = None
+        self._levels = None
+        self._max_counts = None
+
+    def _track_color_change(self, colidx: int, old_color: int, new_color: int):
+        width = self._histograms.shape[1]
+        if new_color >= width:
+            extra = new_color + 1 - width
+            self._histograms = np.pad(self._histograms, ((0, 0), (0, extra)))
+            self._levels = np.pad(self._levels, ((0, extra), (0, 0)))
+            self._levels[width:, 0] = self.colCount
+            self._max_counts = np.pad(self._max_counts, (0, extra))
+
+        for color, step in ((old_color, -1), (new_color, 1)):
+            count = self._histograms[colidx, color]
+            self._histograms[colidx, color] = count + step
+            self._levels[color, count] -= 1
+            self._levels[color, count + step] += 1
+            if count + step > self._max_counts[color]:
+                self._max_counts[color] = count + step
+            elif count == self._max_counts[color] and self._levels[color, count] == 0:
+                # counts move by one, the maximum can only drop by one
+                self._max_counts[color] = count + step
+
+    def resized(self, colCount: int, wireCount: int) -> 'NodeGrid':
+        """
+        Returns a grid of the given dimensions, keeping the colors of the nodes both grids share.
+        """
+        grid = NodeGrid(colCount, wireCount)
+        cols = min(colCount, self.colCount)
+        rows = min(grid.rowCount, self.rowCount)
+        grid.colors[:cols, :rows] = self.colors[:cols, :rows]
+        grid.colors[~grid.mask] = 0
+        return grid
+
+    def _check(self, key: Tuple[int, int]) -> Tuple[int, int]:
+        colidx, rowidx = key
+        if not (0 <= colidx < self.colCount and 0 <= rowidx < self.node_count(colidx)):
+            raise KeyError(key)
+        return colidx, rowidx
+
+    def __getitem__(self, key: Tuple[int, int]) -> int:
+        return int(self.colors[self._check(key)])
+
+    def __setitem__(self, key: Tuple[int, int], color_idx: int):
+        if not 0 <= color_idx <= np.iinfo(self.colors.dtype).max:
+            raise ValueError(f"Color index {color_idx} out of range")
+        key = self._check(key)
+        if self._histograms is not None:
+            old_color = int(self.colors[key])
+            if old_color != color_idx:
+                self._track_color_change(key[0], old_color, color_idx)
+        self.colors[key] = color_idx
+
+    def __delitem__(self, key: Tuple[int, int]):
+        raise TypeError("Nodes can not be removed from the grid")
+
+    def __contains__(self, key) -> bool:
+        try:
+            self._check(key)
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        for colidx in range(self.colCount):
+            for rowidx in range(self.node_count(colidx)):
+                yield (colidx, rowidx)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.mask))
+
+    def items(self):
+        colidx, rowidx = np.nonzero(self.mask)
+        return list(zip(zip(colidx.tolist(), rowidx.tolist()), self.colors[self.mask].tolist()))
+
+    def values(self):
+        return self.colors[self.mask].tolist()
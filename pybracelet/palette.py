@@ -0,0 +1,245 @@
+from typing import Tuple
+
+import numpy as np
+
+from pybracelet.BData import Assortment
+from pybracelet.constraints import column_histograms
+
+
+def color_costs(samples: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """
+    Returns the squared distance of every sampled node color to every palette color.
+
+    :param samples: (colCount, rows, 3) array of node colors, see `image_import.sample_nodes`
+    :param palette: (K, 3) array of colors
+    :return: (colCount, rows, K) array of costs
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    palette = np.asarray(palette, dtype=np.float64)
+    return ((samples[:, :, None, :] - palette[None, None, :, :])**2).sum(axis=-1)
+
+
+def _cheapest_moves(costs: np.ndarray, labels: np.ndarray, mask: np.ndarray,
+                    spare: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # for some columns and every color, the cheapest move of one node of that color
+    # to another color with room left: (extra cost, node row, target color) of shape (n, K),
+    # the extra cost is inf when the column holds no node of that color
+    n, rowCount, color_count = costs.shape
+    extra = costs - np.take_along_axis(costs, labels[:, :, None], axis=2)
+    sources = (mask[:, :, None] & (labels[:, :, None] == np.arange(color_count)))
+    # (n, source color, row, target color)
+    allowed = sources.transpose(0, 2, 1)[:, :, :, None] & spare[:, None, None, :] & ~np.eye(color_count, dtype=bool)[None, :, None, :]
+    moves = np.where(allowed, extra[:, None, :, :], np.inf).reshape(n, color_count, -1)
+
+    flat = moves.argmin(axis=2)
+    rows, targets = np.divmod(flat, color_count)
+    return np.take_along_axis(moves, flat[:, :, None], axis=2)[:, :, 0], rows, targets
+
+
+def _residual_graph(costs: np.ndarray, labels: np.ndarray, mask: np.ndarray,
+                    caps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # moves of a single node in every column, between the colors and a spare vertex:
+    # a -> b moves the cheapest node of color a to b, spare -> a takes a node out of color a,
+    # b -> spare puts it in a color with room left. returns (n, K + 1, K + 1) weights, and the
+    # (n, K, K) row of the node moved by every color to color edge
+    n, rowCount, color_count = costs.shape
+    counts = column_histograms(labels, mask, color_count)
+    extra = costs - np.take_along_axis(costs, labels[:, :, None], axis=2)
+
+    # nodes grouped by (column, color), rows in increasing order within a group
+    colidx, rowidx = np.nonzero(mask)
+    groups = colidx * color_count + labels[colidx, rowidx]
+    order = np.argsort(groups, kind="stable")
+    groups, rowidx, values = groups[order], rowidx[order], extra[colidx[order], rowidx[order]]
+    first = np.ones(len(groups), dtype=bool)
+    first[1:] = groups[1:] != groups[:-1]
+    starts = np.flatnonzero(first)
+
+    pair_weights = np.full((n * color_count, color_count), np.inf)
+    pair_rows = np.zeros((n * color_count, color_count), dtype=np.int64)
+    if len(starts):
+        pair_weights[groups[starts]] = np.minimum.reduceat(values, starts, axis=0)
+        # the first row reaching the minimum, as an argmin would
+        at_min = values == pair_weights[groups]
+        pair_rows[groups[starts]] = np.minimum.reduceat(np.where(at_min, rowidx[:, None], rowCount), starts, axis=0)
+    weights = np.full((n, color_count + 1, color_count + 1), np.inf)
+    weights[:, :color_count, :color_count] = pair_weights.reshape(n, color_count, color_count)
+    weights[:, :color_count, color_count] = np.where(counts < caps[None, :], 0, np.inf)
+    weights[:, color_count, :color_count] = 0
+    weights[:, np.arange(color_count), np.arange(color_count)] = np.inf
+    return weights, pair_rows.reshape(n, color_count, color_count)
+
+
+def _exchange(costs: np.ndarray, labels: np.ndarray, mask: np.ndarray, caps: np.ndarray) -> None:
+    # cancels the negative cycles of the residual graph in every column, in place, keeping the counts
+    # within caps. without a negative cycle, every column's labelling is the cheapest one under the caps
+    color_count = costs.shape[2]
+    spare = color_count
+    tolerance = 1e-9 * max(float(np.abs(costs).max(initial=0)), 1)
+    # only the columns changed by the previous round can hold a new negative cycle
+    columns = np.arange(len(costs))
+    while len(columns):
+        weights, pair_rows = _residual_graph(costs[columns], labels[columns], mask[columns], caps)
+
+        # Bellman-Ford from a virtual source next to every vertex, all columns at once,
+        # a column still updated after as many rounds as vertices holds a negative cycle
+        distances = np.zeros((len(columns), color_count + 1))
+        predecessors = np.full((len(columns), color_count + 1), -1)
+        active = np.arange(len(columns))
+        for _ in range(color_count + 2):
+            candidates = distances[active, :, None] + weights[active]
+            nearest = candidates.argmin(axis=1)
+            best = np.take_along_axis(candidates, nearest[:, None, :], axis=1)[:, 0]
+            updated = best < distances[active] - tolerance
+            distances[active] = np.where(updated, best, distances[active])
+            predecessors[active] = np.where(updated, nearest, predecessors[active])
+            keep = updated.any(axis=1)
+            active, updated = active[keep], updated[keep]
+            if len(active) == 0:
+                break
+
+        for k, still in zip(active.tolist(), updated):
+            # walking back from a vertex still updated ends up on a negative cycle
+            vertex = int(np.argmax(still))
+            for _ in range(color_count + 1):
+                vertex = int(predecessors[k, vertex])
+            cycle = [vertex]
+            while predecessors[k, cycle[-1]] != vertex:
+                cycle.append(int(predecessors[k, cycle[-1]]))
+            for target in cycle:
+                source = int(predecessors[k, target])
+                if source != spare and target != spare:
+                    labels[columns[k], pair_rows[k, source, target]] = target
+        columns = columns[active]
+
+
+def _handover_costs(costs: np.ndarray, labels: np.ndarray, mask: np.ndarray, counts: np.ndarray,
+                    caps: np.ndarray) -> np.ndarray:
+    # for some columns left by `_exchange`, the (n, K, K) extra cost of lowering color a and raising color b.
+    # without negative cycles, the cost of the handover in a column is a shortest path of its
+    # residual graph: out of the lowered color, into the raised one, or from one to the other when
+    # the column is at both caps
+    color_count = costs.shape[2]
+    spare = color_count
+    distances, _ = _residual_graph(costs, labels, mask, caps)
+    for vertex in range(color_count + 1):
+        np.minimum(distances, distances[:, :, vertex, None] + distances[:, None, vertex, :], out=distances)
+    # colors without a node have no path out, they cannot be lowered anyway
+    distances[~np.isfinite(distances)] = 0
+
+    at_cap = (counts == caps[None, :]).astype(np.float64)
+    below = 1 - at_cap
+    lowered = at_cap * distances[:, :color_count, spare]
+    raised = at_cap * distances[:, spare, :color_count]
+    return (lowered[:, :, None] * below[:, None, :] + below[:, :, None] * raised[:, None, :]
+            + at_cap[:, :, None] * at_cap[:, None, :] * distances[:, :color_count, :color_count])
+
+
+def _exchange_caps(costs: np.ndarray, labels: np.ndarray, mask: np.ndarray, caps: np.ndarray) -> np.ndarray:
+    # local search over the assortment, in place, on labellings left by `_exchange`:
+    # hands one wire of a color to another color while that lowers the total cost.
+    # handovers are tried by increasing estimate (`_handover_costs` summed over the columns),
+    # then solved exactly on the columns at either cap. after a handover, histograms and estimates
+    # are only updated for the columns it touched or left at the lowered cap
+    color_count = costs.shape[2]
+    tolerance = 1e-9 * max(float(np.abs(costs).max(initial=0)), 1)
+    counts = column_histograms(labels, mask, color_count)
+    handovers = _handover_costs(costs, labels, mask, counts, caps)
+    totals = handovers.sum(axis=0)
+    while True:
+        estimates = totals.copy()
+        estimates[caps == 0] = np.inf
+        estimates[np.arange(color_count), np.arange(color_count)] = np.inf
+
+        for flat in np.argsort(estimates, axis=None).tolist():
+            source, target = divmod(flat, color_count)
+            if not estimates[source, target] < -tolerance:
+                return caps
+            trial_caps = caps.copy()
+            trial_caps[source] -= 1
+            trial_caps[target] += 1
+            columns = np.nonzero((counts[:, source] == caps[source]) | (counts[:, target] == caps[target]))[0]
+            trial = labels[columns]
+            # columns at the lowered cap move their cheapest node of that color to a color with room left
+            move_costs, move_rows, move_targets = _cheapest_moves(costs[columns], trial, mask[columns],
+                                                                  counts[columns] < trial_caps[None, :])
+            forced = np.nonzero(counts[columns, source] == caps[source])[0]
+            trial[forced, move_rows[forced, source]] = move_targets[forced, source]
+            _exchange(costs[columns], trial, mask[columns], trial_caps)
+
+            before = np.take_along_axis(costs[columns], labels[columns][:, :, None], axis=2)[:, :, 0][mask[columns]].sum()
+            after = np.take_along_axis(costs[columns], trial[:, :, None], axis=2)[:, :, 0][mask[columns]].sum()
+            if after < before - tolerance:
+                break
+        else:
+            return caps
+
+        labels[columns] = trial
+        counts[columns] = column_histograms(trial, mask[columns], color_count)
+        caps = trial_caps
+        # columns now at the lowered cap lost room for that color
+        dirty = np.union1d(columns, np.nonzero(counts[:, source] == caps[source])[0])
+        updated = _handover_costs(costs[dirty], labels[dirty], mask[dirty], counts[dirty], caps)
+        totals += updated.sum(axis=0) - handovers[dirty].sum(axis=0)
+        handovers[dirty] = updated
+
+
+def fit_wire_count(costs: np.ndarray, mask: np.ndarray, wireCount: int) -> Tuple[np.ndarray, Assortment]:
+    """
+    Assigns a palette color to every node, minimizing the total cost while the wire assortment
+    (the highest count of every color in a single column, see `BData.wire_assortment`) fits `wireCount`.
+
+    Nodes start with their cheapest color. While the assortment takes too many wires, the color
+    whose highest count is the cheapest to lower by one is lowered: in every column holding that count,
+    the node whose move to a color with room left costs least is moved. Per column histograms and
+    cheapest moves are updated for the touched columns only. A column always has room left,
+    since the assortment never drops below `wireCount`, which is at least the column's node count.
+
+    The greedy labelling is then improved by local search. Within every column, cycles of moves that
+    lower the cost are applied until none is left (`_exchange`), which makes every column the cheapest
+    under the assortment. Between colors, one wire is handed from a color to another while that lowers
+    the total cost. This is not exact: on small random grids the result stays within 10% of the
+    optimum, and almost always matches it.
+
+    :param costs: (colCount, rows, K) cost of every color for every node, see `color_costs`
+    :param mask: (colCount, rows) boolean array of the positions holding a node
+    :param wireCount: Number of wires of the bracelet
+    :raises ValueError: If there are more nodes in a column than wires
+    :return: (colCount, rows) uint8 array of color indices, 0 outside of the mask, and the assortment
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    colCount, rowCount, color_count = costs.shape
+    if rowCount > wireCount:
+        raise ValueError(f"{rowCount} nodes per column do not fit {wireCount} wires")
+
+    labels = np.where(mask, costs.argmin(axis=2), 0)
+    counts = column_histograms(labels, mask, color_count)
+    caps = counts.max(axis=0) if colCount else np.zeros(color_count, dtype=np.int64)
+
+    # cheapest move of every (column, color), only recomputed for the columns a step touched
+    move_costs, move_rows, move_targets = _cheapest_moves(costs, labels, mask, counts < caps[None, :])
+    while caps.sum() > wireCount:
+        at_cap = counts == caps[None, :]
+        totals = np.where(at_cap, move_costs, 0).sum(axis=0)
+        totals[caps == 0] = np.inf
+        color = int(totals.argmin())
+
+        repaired = np.nonzero(at_cap[:, color])[0]
+        rows = move_rows[repaired, color]
+        targets = move_targets[repaired, color]
+        labels[repaired, rows] = targets
+        counts[repaired, color] -= 1
+        counts[repaired, targets] += 1
+        caps[color] -= 1
+
+        # repaired columns changed, and columns now at the lowered count lost room for that color
+        dirty = np.union1d(repaired, np.nonzero(counts[:, color] == caps[color])[0])
+        move_costs[dirty], move_rows[dirty], move_targets[dirty] = _cheapest_moves(
+            costs[dirty], labels[dirty], mask[dirty], counts[dirty] < caps[None, :])
+
+    _exchange(costs, labels, mask, caps)
+    caps = _exchange_caps(costs, labels, mask, caps)
+    caps = column_histograms(labels, mask, color_count).max(axis=0) if colCount else caps
+
+    labels[~mask] = 0
+    return labels.astype(np.uint8), Assortment({color: int(cap) for color, cap in enumerate(caps.tolist()) if cap > 0})
@@ -0,0 +1,99 @@
+import collections
+import concurrent.futures
+import itertools
+import os
+from typing import Generator, List, Optional, Tuple
+
+from pybracelet import bformat
+from pybracelet.BData import Assortment, BChunk, BData, NodeType
+from pybracelet.encoding import pack_node_types, unpack_node_types
+
+
+def _solve_shard(design: bytes, column_index: int, assortment: List[Tuple[int, int]],
+                 start: int, stop: int, limit: Optional[int]) -> List[Tuple[List[int], List[int]]]:
+    # solutions are grouped by input, node types packed as in `encoding.pack_node_types`,
+    # and the shard stops after `limit` solutions, the caller never needs more of them
+    bdata = bformat.loads(design)
+    chunk = BChunk(bdata, column_index)
+    solutions = []
+    found = 0
+    for valid_input in Assortment(assortment).generate_valid_inputs(chunk.wire_count, start, stop):
+        chunk.set_input_wire_colors(valid_input)
+        packed = [pack_node_types(nt) for nt in itertools.islice(chunk.enumerate_admissible_nodetypes(),
+                                                                 None if limit is None else limit - found)]
+        if packed:
+            solutions.append((valid_input, packed))
+            found += len(packed)
+            if limit is not None and found >= limit:
+                break
+    return solutions
+
+
+def parallel_enumerate_possible_input_wire_colors(bdata: BData, column_index: int = 0,
+                                                  assortment: Optional[Assortment] = None,
+                                                  max_workers: Optional[int] = None,
+                                                  shard_size: Optional[int] = None,
+                                                  limit: Optional[int] = None,
+                                                  ordered: bool = True) -> Generator[Tuple[List[int], Tuple[NodeType, ...]], None, None]:
+    """
+    Parallel `BChunk.enumerate_possible_input_wire_colors`, over a process pool.
+
+    The valid inputs of the assortment are sharded into ranges of their index
+    (see `Assortment.generate_valid_inputs`), and every shard is solved by a worker.
+    Only a bounded number of shards are in flight, and pending shards are cancelled
+    once `limit` solutions were yielded or the generator is closed.
+
+    :param bdata: The bracelet
+    :param column_index: Column to solve
+    :param assortment: Wire assortment, defaults to `BData.wire_assortment`
+    :param max_workers: Number of worker processes, defaults to the number of CPUs
+    :param shard_size: Number of inputs per shard, defaults to a few shards per worker
+    :param limit: Stop after that many solutions
+    :param ordered: Yield solutions in the serial order, otherwise as shards complete
+    :return: A generator yielding (input wire colors, node types)
+    """
+    if assortment is None:
+        assortment = bdata.wire_assortment()
+    if limit is not None and limit <= 0:
+        return
+    max_workers = max_workers or os.cpu_count() or 1
+    total = assortment.count_valid_inputs(bdata.wireCount)
+    if shard_size is None:
+        shard_size = max(total // (max_workers * 16), 1)
+
+    design = bformat.dumps(bdata)
+    node_count = bdata.nodes.node_count(column_index)
+    items = list(assortment.items())
+    shards = iter(range(0, total, shard_size))
+    yielded = 0
+
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        pending = collections.deque()
+
+        def submit():
+            start = next(shards, None)
+            if start is not None:
+                pending.append(executor.submit(_solve_shard, design, column_index, items,
+                                               start, min(start + shard_size, total), limit))
+
+        for _ in range(max_workers * 2):
+            submit()
+
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            submit()
+
+            for valid_input, packed in future.result():
+                for node_types in packed:
+                    yield valid_input, tuple(NodeType(code) for code in unpack_node_types(node_types, node_count))
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
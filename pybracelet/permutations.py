@@ -0,0 +1,137 @@
+import math
+from typing import Dict, Generator, Iterable, List, Optional, Sequence
+
+
+class MultisetPermutations():
+    """
+    Distinct permutations of a multiset, in lexicographic order.
+
+    Permutations are produced one at a time with the in-place "next permutation"
+    step, so memory stays O(W) and each item costs constant amortized time.
+    The space can also be sized with `count()` and indexed with `nth()` / `rank()`
+    without being enumerated.
+    """
+
+    def __init__(self, elements: Iterable[int]):
+        """
+        :param elements: The multiset to permute, duplicates allowed
+        """
+        self.elements: List[int] = sorted(elements)
+
+        # multiplicity of each distinct element, in sorted order
+        self.counts: Dict[int, int] = {}
+        for element in self.elements:
+            self.counts[element] = self.counts.get(element, 0) + 1
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return self.iterate()
+
+    def count(self) -> int:
+        """
+        Returns the number of distinct permutations (the multinomial coefficient).
+        """
+        return _multinomial(self.counts.values())
+
+    def nth(self, index: int) -> List[int]:
+        """
+        Returns the permutation at the given lexicographic index (unranking).
+
+        :param index: Position of the permutation, 0 <= index < count()
+        :raises IndexError: If the index is out of range
+        """
+        total = self.count()
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError("Permutation index out of range")
+
+        counts = dict(self.counts)
+        remaining = len(self.elements)
+        permutation = []
+        for _ in range(len(self.elements)):
+            for element, element_count in counts.items():
+                if element_count == 0:
+                    continue
+                # number of permutations starting with `element`
+                block = total * element_count // remaining
+                if index < block:
+                    permutation.append(element)
+                    counts[element] -= 1
+                    total = block
+                    break
+                index -= block
+            remaining -= 1
+        return permutation
+
+    def rank(self, permutation: Sequence[int]) -> int:
+        """
+        Returns the lexicographic index of a permutation (ranking), inverse of `nth`.
+
+        :param permutation: A permutation of the multiset
+        :raises ValueError: If the sequence is not a permutation of the multiset
+        """
+        if sorted(permutation) != self.elements:
+            raise ValueError("Sequence is not a permutation of the multiset")
+
+        counts = dict(self.counts)
+        total = self.count()
+        remaining = len(self.elements)
+        index = 0
+        for value in permutation:
+            for element, element_count in counts.items():
+                if element == value:
+                    break
+                index += total * element_count // remaining
+            total = total * counts[value] // remaining
+            counts[value] -= 1
+            remaining -= 1
+        return index
+
+    def iterate(self, start: int = 0, stop: Optional[int] = None) -> Generator[List[int], None, None]:
+        """
+        Yields the permutations with index in [start, stop), in lexicographic order.
+
+        :param start: Index of the first permutation to yield
+        :param stop: Index one past the last permutation to yield, None for the end
+        """
+        total = self.count()
+        stop = total if stop is None else min(stop, total)
+        if start >= stop:
+            return
+
+        current = self.nth(start)
+        yield list(current)
+        for _ in range(stop - start - 1):
+            _next_permutation(current)
+            yield list(current)
+
+
+def _multinomial(counts: Iterable[int]) -> int:
+    result = 1
+    total = 0
+    for count in counts:
+        total += count
+        result *= math.comb(total, count)
+    return result
+
+
+def _next_permutation(values: List[int]) -> bool:
+    """
+    Rearranges `values` in place into the next lexicographic permutation.
+    Returns False (leaving `values` untouched) when it is already the last one.
+    """
+    i = len(values) - 2
+    while i >= 0 and values[i] >= values[i + 1]:
+        i -= 1
+    if i < 0:
+        return False
+
+    j = len(values) - 1
+    while values[j] <= values[i]:
+        j -= 1
+    values[i], values[j] = values[j], values[i]
+    values[i + 1:] = values[:i:-1]
+    return True
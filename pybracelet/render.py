@@ -0,0 +1,82 @@
+import io
+from typing import Optional, Tuple
+
+import numpy as np
+
+from pybracelet.BData import BData
+
+
+def _rgb(color: str) -> Tuple[int, int, int]:
+    from PIL import ImageColor
+    return ImageColor.getrgb(color)[:3]
+
+
+def node_sprite(masterScale: int) -> np.ndarray:
+    """
+    Returns the boolean mask of one node oval, with the size of the rectangle of `rowColToPixRect`.
+    """
+    width = masterScale - 2 * (masterScale - int(0.95 * masterScale))
+    height = masterScale - 2 * (masterScale - int(0.9 * masterScale))
+    y, x = np.mgrid[0:height, 0:width]
+    return ((x + 0.5 - width / 2) / (width / 2))**2 + ((y + 0.5 - height / 2) / (height / 2))**2 <= 1
+
+
+def render_array(bdata: BData, masterScale: Optional[int] = None) -> np.ndarray:
+    """
+    Renders the bracelet as a (height, width, 3) uint8 RGB array, laid out as in the editor.
+
+    The node sprite is stamped at every node of a color at once, one color at a time.
+
+    :param bdata: The bracelet to render
+    :param masterScale: Scale of the rendering, defaults to the bracelet's masterScale
+    """
+    masterScale = bdata.masterScale if masterScale is None else masterScale
+    width = (bdata.colCount//2+2)*masterScale
+    height = masterScale*bdata.wireCount//2
+
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:, :] = _rgb(bdata.backGroundColor)
+
+    sprite = node_sprite(masterScale)
+    sprite_rows, sprite_cols = np.nonzero(sprite)
+
+    # top left corner of every node oval, same geometry as rowColToPixRect
+    colidx, rowidx = np.nonzero(bdata.nodes.mask)
+    odd_shift = (colidx % 2) * (masterScale // 2)
+    sx = (colidx // 2) * masterScale + odd_shift
+    sy = rowidx * masterScale + odd_shift
+    left = sx + masterScale - int(0.95 * masterScale)
+    # graph coordinates start at the bottom of the canvas, image rows at the top
+    top = height - (sy + int(0.9 * masterScale))
+
+    node_colors = bdata.nodes.colors[bdata.nodes.mask]
+    for coloridx in np.unique(node_colors).tolist():
+        if coloridx not in bdata.colorRegistry:
+            raise ValueError(f"Color index {coloridx} not found in color registry.")
+        selected = node_colors == coloridx
+        rows = top[selected, None] + sprite_rows[None, :]
+        cols = left[selected, None] + sprite_cols[None, :]
+        inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+        image[rows[inside], cols[inside]] = _rgb(bdata.colorRegistry[coloridx])
+    return image
+
+
+def render(bdata: BData, masterScale: Optional[int] = None):
+    """
+    Renders the bracelet as a PIL image, see `render_array`.
+    """
+    from PIL import Image
+    return Image.fromarray(render_array(bdata, masterScale), mode="RGB")
+
+
+def render_bytes(bdata: BData, masterScale: Optional[int] = None, format: str = "PNG") -> bytes:
+    """
+    Renders the bracelet and returns the encoded image.
+
+    :param format: "raw" for the RGB pixels row by row, or any PIL image format such as "PNG"
+    """
+    if format == "raw":
+        return render_array(bdata, masterScale).tobytes()
+    buffer = io.BytesIO()
+    render(bdata, masterScale).save(buffer, format=format)
+    return buffer.getvalue()
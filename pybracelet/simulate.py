@@ -0,0 +1,118 @@
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pybracelet.BData import BData, NodeType
+from pybracelet.engine import COLOR_FROM_RIGHT, OUTPUT_SWAPPED, evaluate_node_types, wire_array
+
+
+_PAIR_TABLES = None
+
+
+def _pair_tables() -> Tuple[np.ndarray, np.ndarray]:
+    # the two uint8 wires of a node, read as one uint16, index a table per node type code:
+    # tables[code << 16 | pair] -> (node color, output wires read as one uint16)
+    global _PAIR_TABLES
+    if _PAIR_TABLES is None:
+        pairs = np.arange(1 << 16, dtype=np.uint16)
+        left, right = pairs.view(np.uint8).reshape(-1, 2).T
+        node_colors = np.concatenate([right if takes_right else left for takes_right in COLOR_FROM_RIGHT])
+        outputs = np.concatenate([np.stack([right, left], axis=1).ravel().view(np.uint16) if swaps else pairs
+                                  for swaps in OUTPUT_SWAPPED])
+        _PAIR_TABLES = node_colors, outputs
+    return _PAIR_TABLES
+
+
+def encode_grid(grid: Sequence[Sequence[NodeType]], wireCount: int) -> np.ndarray:
+    """
+    Encodes the node types of every column (as returned by `BSolver.solve`) as a
+    (colCount, wireCount // 2) uint8 array of node type codes, laid out as `NodeGrid.colors`.
+    The last row of odd columns holds no node and is left at 0.
+    """
+    codes = np.zeros((len(grid), wireCount // 2), dtype=np.uint8)
+    for colidx, node_types in enumerate(grid):
+        codes[colidx, :len(node_types)] = [node_type.value for node_type in node_types]
+    return codes
+
+
+def random_node_types(count: int, colCount: int, wireCount: int,
+                      rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Draws `count` random node type grids, as a (count, colCount, wireCount // 2) uint8 array.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    return rng.integers(0, len(NodeType), size=(count, colCount, wireCount // 2), dtype=np.uint8)
+
+
+def simulate(node_types: np.ndarray, start_wires: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Knots K bracelets at once, from their starting wires and the node type of every node.
+
+    Columns are evaluated one after the other, every column for all the grids at once.
+    Wires holding uint8 colors are knotted in place with one table lookup per node,
+    see `_pair_tables`, others with `engine.evaluate_node_types`.
+
+    :param node_types: uint8 array of node type codes of shape (K, colCount, wireCount // 2),
+                       or (colCount, wireCount // 2) for a single grid, see `encode_grid`
+    :param start_wires: Wire colors entering the first column, of shape (W,) shared by all grids, or (K, W)
+    :raises ValueError: If the grids and the wires do not have the same number of rows
+    :return: node colors of shape (K, colCount, wireCount // 2), laid out as `NodeGrid.colors`,
+             and the wires leaving the last column, of shape (K, W)
+    """
+    node_types = np.asarray(node_types, dtype=np.uint8)
+    single = node_types.ndim == 2
+    if single:
+        node_types = node_types[None]
+    candidate_count, colCount, rowCount = node_types.shape
+
+    wires = wire_array(start_wires)
+    if wires.shape[-1] // 2 != rowCount:
+        raise ValueError(f"{wires.shape[-1]} wires do not knot {rowCount} rows of nodes")
+    wires = np.array(np.broadcast_to(wires, (candidate_count, wires.shape[-1])), order="C")
+
+    # column major copies, so that every step reads and writes contiguous blocks
+    column_types = np.ascontiguousarray(node_types.transpose(1, 0, 2))
+    colors = np.zeros((colCount, candidate_count, rowCount), dtype=wires.dtype)
+    for colidx in range(colCount):
+        even = colidx % 2 == 0
+        node_count = rowCount if even else rowCount - 1
+        if wires.dtype == np.uint8:
+            node_colors, outputs = _pair_tables()
+            first = 0 if even else 1
+            pairs = wires[:, first:first + 2 * node_count].view(np.uint16)
+            index = (column_types[colidx, :, :node_count].astype(np.uint32) << 16) | pairs
+            colors[colidx, :, :node_count] = node_colors[index]
+            pairs[...] = outputs[index]
+        else:
+            colors[colidx, :, :node_count], wires = evaluate_node_types(column_types[colidx, :, :node_count], wires, even)
+    colors = colors.transpose(1, 0, 2)
+
+    if single:
+        return colors[0], wires[0]
+    return colors, wires
+
+
+def simulate_bdata(start_wires: Sequence[int], grid: Sequence[Sequence[NodeType]],
+                   colorRegistry: Optional[Dict[int, str]] = None, masterScale: int = 64) -> BData:
+    """
+    Knots a bracelet from its starting wires and the node types of every column, see `simulate`.
+
+    :param start_wires: Wire colors entering the first column
+    :param grid: Node types of every column
+    :param colorRegistry: Color registry of the bracelet, BData's default if None
+    :param masterScale: Scale factor of the bracelet
+    :raises ValueError: If a wire color does not fit the node grid, as in `NodeGrid.__setitem__`
+    :return: BData instance holding the resulting node colors
+    """
+    wireCount = len(start_wires)
+    bdata = BData(wireCount=wireCount, colCount=len(grid), masterScale=masterScale)
+    max_color = np.iinfo(bdata.nodes.colors.dtype).max
+    for color in start_wires:
+        if not 0 <= color <= max_color:
+            raise ValueError(f"Color index {color} out of range")
+    colors, _ = simulate(encode_grid(grid, wireCount), start_wires)
+
+    if colorRegistry is not None:
+        bdata.colorRegistry = dict(colorRegistry)
+    bdata.nodes.colors[bdata.nodes.mask] = colors[bdata.nodes.mask]
+    return bdata
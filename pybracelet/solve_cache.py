@@ -0,0 +1,86 @@
+import collections
+import hashlib
+import json
+import os
+from typing import List, Optional, Tuple
+
+from pybracelet.BData import Assortment, BChunk, NodeType
+from pybracelet.constraints import assortment_uindex, color_uindex
+
+
+ChunkSolutions = List[Tuple[List[int], Tuple[NodeType, ...]]]
+
+
+class ChunkSolutionCache():
+    """
+    Memoizes `BChunk.enumerate_possible_input_wire_colors` on the canonical form of the column.
+
+    Columns and assortments are relabelled to universal color indices (see `constraints.color_uindex`),
+    so two columns with the same pattern up to a renaming of their colors are solved once,
+    and the solutions are mapped back to the real colors of each column.
+    Solutions are kept in an in-memory LRU, and optionally in a directory on disk.
+    """
+
+    def __init__(self, maxsize: int = 1024, directory: Optional[str] = None):
+        """
+        :param maxsize: Number of canonical columns kept in memory
+        :param directory: Directory where solutions are also stored, None to keep them in memory only
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self.entries: "collections.OrderedDict[tuple, ChunkSolutions]" = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def solve(self, chunk: BChunk, assortment: Assortment) -> ChunkSolutions:
+        """
+        Returns every (input wire colors, node types) solution of the chunk for the assortment,
+        in the order of the canonical column.
+        """
+        ucc, mapping = color_uindex(chunk.colors)
+        mapping = assortment_uindex(assortment, mapping)
+        canonical_assortment = tuple(sorted((mapping[color], count) for color, count in assortment.items()))
+        key = (chunk.wire_count, ucc, canonical_assortment)
+
+        solutions = self._get(key)
+        if solutions is None:
+            self.misses += 1
+            canonical_chunk = BChunk.from_colors(chunk.wire_count, list(ucc))
+            solutions = [(list(inputs), tuple(node_types)) for inputs, node_types
+                         in canonical_chunk.enumerate_possible_input_wire_colors(Assortment(canonical_assortment))]
+            self._put(key, solutions)
+        else:
+            self.hits += 1
+
+        colors = {uindex: color for color, uindex in mapping.items()}
+        return [([colors[uindex] for uindex in inputs], node_types) for inputs, node_types in solutions]
+
+    def _get(self, key: tuple) -> Optional[ChunkSolutions]:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if self.directory is not None:
+            path = self._path(key)
+            if os.path.exists(path):
+                with open(path, "r") as fin:
+                    solutions = [(inputs, tuple(NodeType(code) for code in codes)) for inputs, codes in json.load(fin)]
+                self._remember(key, solutions)
+                return solutions
+        return None
+
+    def _put(self, key: tuple, solutions: ChunkSolutions):
+        self._remember(key, solutions)
+        if self.directory is not None:
+            with open(self._path(key), "w") as fout:
+                json.dump([[inputs, [node_type.value for node_type in node_types]] for inputs, node_types in solutions], fout)
+
+    def _remember(self, key: tuple, solutions: ChunkSolutions):
+        self.entries[key] = solutions
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def _path(self, key: tuple) -> str:
+        return os.path.join(self.directory, hashlib.sha256(repr(key).encode("utf-8")).hexdigest() + ".json")
@@ -1,28 +1,33 @@
-from PIL  import Image,ImageDraw2,ImageDraw
-
 import numpy as np
-from scipy.cluster.vq import kmeans,vq
-import pandas as pd
 import operator
 import functools
 import itertools
 
 from collections import Counter
 
-def minimalDistribution(nodes,colorCount):
-    # calculate color distribution by column
-    dists = nodes.groupby("colidx").apply(lambda x:Counter(x["cidx"]))
+from pybracelet.constraints import color_uindex_table, column_histograms, minimal_distribution
+
 
-    # calculate minimal distribution
-    minimalDist = {k:0 for k in range(colorCount)}
+def dense_nodes(nodes, value="cidx"):
+    """
+    dense node array of a node dataframe
 
-    for adist in dists.values:
-        for k,v in adist.items():
-            if v > minimalDist[k]:
-                minimalDist[k]=v
-    minimumWireCount = sum([v for cidx,v in minimalDist.items() ])
+    :param nodes: dataframe with colidx, rowidx and the value column
+    :return: (colCount, rows) array of values, (colCount, rows) mask of the nodes
+    """
+    colidx = nodes["colidx"].to_numpy(dtype=np.int64)
+    rowidx = nodes["rowidx"].to_numpy(dtype=np.int64)
+    values = np.zeros((colidx.max()+1, rowidx.max()+1), dtype=np.int64)
+    mask = np.zeros(values.shape, dtype=bool)
+    values[colidx, rowidx] = nodes[value].to_numpy(dtype=np.int64)
+    mask[colidx, rowidx] = True
+    return values, mask
 
-    return minimumWireCount,minimalDist
+
+def minimalDistribution(nodes,colorCount):
+    # calculate color distribution by column, then the minimal distribution
+    colors, mask = dense_nodes(nodes)
+    return minimal_distribution(colors, mask, colorCount)
 
 
 
@@ -43,8 +48,11 @@ def colorIndexor_inapply(acol):
     return colindexor
 
 def colorUIndex(nodes):
-    colorIndex= nodes.groupby("colidx").apply(colorIndexor_inapply).reset_index(drop=True)
-    return colorIndex
+    colors, mask = dense_nodes(nodes)
+    colidx, cidx, ucidx, _ = color_uindex_table(colors, mask)
+    import pandas as pd
+    colorIndex = pd.DataFrame({"ucidx": ucidx, "colidx": colidx, "cidx": cidx})
+    return colorIndex.sort_values(["colidx", "ucidx"]).reset_index(drop=True)
 
 def re_index(nodes,colorIndex):
     """
@@ -53,20 +61,31 @@ def re_index(nodes,colorIndex):
     :param colorIndex:
     :return:
     """
-    return nodes.join(colorIndex.set_index(["colidx", "cidx"]), on=["colidx", "cidx"], rsuffix="lol")
-
+    width = max(nodes["cidx"].max(), colorIndex["cidx"].max()) + 1
+    colCount = max(nodes["colidx"].max(), colorIndex["colidx"].max()) + 1
+    # ucidx of every (colidx, cidx), -1 when the color index has none
+    lookup = np.full(colCount*width, -1, dtype=np.int64)
+    lookup[colorIndex["colidx"].to_numpy(dtype=np.int64)*width + colorIndex["cidx"].to_numpy(dtype=np.int64)] = colorIndex["ucidx"].to_numpy()
 
-def getColorConstraints(nodesUindexed):
-    colorConstraints = nodesUindexed.groupby(["colidx"]).apply(lambda x: pd.DataFrame([ [tuple(x.sort_values("rowidx")["ucidx"].values),
-                                                                             Counter(x["cidx"]),
-                                                                                         Counter(x["ucidx"])]],
-                                                                                      index = [x["colidx"].values[0]],
+    nodesUindexed = nodes.copy()
+    nodesUindexed["ucidx"] = lookup[nodes["colidx"].to_numpy(dtype=np.int64)*width + nodes["cidx"].to_numpy(dtype=np.int64)]
+    return nodesUindexed
 
 
-                                                                                      columns=["ucc","dc","ucidx"]))
-
-    colorConstraints = colorConstraints.reset_index()#[["colidx","ucc"]]
-    colorConstraints =colorConstraints.drop(columns=["level_1"])
+def getColorConstraints(nodesUindexed):
+    colors, mask = dense_nodes(nodesUindexed)
+    ucidx, _ = dense_nodes(nodesUindexed, value="ucidx")
+    node_counts = mask.sum(axis=1).tolist()
+    dc = column_histograms(colors, mask)
+    uc = column_histograms(ucidx, mask)
+
+    import pandas as pd
+    colorConstraints = pd.DataFrame({
+        "colidx": np.arange(colors.shape[0]),
+        "ucc": [tuple(ucidx[colidx, :node_count].tolist()) for colidx, node_count in enumerate(node_counts)],
+        "dc": [Counter({k: v for k, v in enumerate(counts) if v}) for counts in dc.tolist()],
+        "ucidx": [Counter({k: v for k, v in enumerate(counts) if v}) for counts in uc.tolist()],
+    })
     return colorConstraints
 
 
@@ -74,6 +93,7 @@ def bimage(nodes,wireCount,colormap):
     """
     image of bracelet
     """
+    from PIL import Image, ImageDraw
     xscale = 40
     yscale = 60
 
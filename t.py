@@ -1,62 +1,143 @@
 import os
 import FreeSimpleGUI as sg
-from PIL import  Image
 import io
-import pandas as pd
 from pybracelet.BData import BData, rowColToPixRect
-from pybracelet.color_map import COLOR_MAP
+from pybracelet.color_map import COLOR_MAP, hex_to_rgb
 import json
+import numpy as np
 
-def popup_color_chooser(look_and_feel=None):
+class ColorPicker():
     """
+    Color chooser drawing every color of COLOR_MAP as one swatch image on an sg.Graph.
 
-    :return: Any(str, None) Returns hex string of color chosen or None if nothing was chosen
+    A click is resolved to its color from the swatch grid geometry. The window is built on first use,
+    then hidden rather than closed, so that later invocations only show it again,
+    unless COLOR_MAP changed in between (see `refresh`).
     """
-    color_map = COLOR_MAP
+    def __init__(self, look_and_feel=None, row_len=40, cell=16):
+        """
+        :param look_and_feel: Theme of the picker window
+        :param row_len: Number of swatches per row
+        :param cell: Size of a swatch in pixels
+        """
+        self.look_and_feel = look_and_feel
+        self.row_len = row_len
+        self.cell = cell
+        self.window = None
+        self._load_colors()
+
+    def _load_colors(self):
+        # (color name, hex string)
+        self.colors = list(COLOR_MAP.items())
+        self.size = (self.row_len * self.cell, -(-len(self.colors) // self.row_len) * self.cell)
+
+    def refresh(self) -> bool:
+        """
+        Reloads the colors if COLOR_MAP changed since the swatches were drawn,
+        the window is then built again on next use.
 
-    old_look_and_feel = None
-    if look_and_feel is not None:
-        old_look_and_feel = sg.CURRENT_LOOK_AND_FEEL
-        sg.theme(look_and_feel)
+        :return: True if the colors were reloaded
+        """
+        if self.colors == list(COLOR_MAP.items()):
+            return False
+        if self.window is not None:
+            self.window.close()
+            self.window = None
+        self._load_colors()
+        return True
+
+    def swatch_image(self) -> bytes:
+        """
+        Returns the PNG image of the swatch grid, colors laid out row by row.
+        """
+        rows = self.size[1] // self.cell
+        rgb = np.zeros((rows * self.row_len, 3), dtype=np.uint8)
+        rgb[:len(self.colors)] = hex_to_rgb([color for _, color in self.colors])
+        # one cell per color, with a one pixel gap on the right and bottom
+        pixels = np.repeat(np.repeat(rgb.reshape(rows, self.row_len, 3), self.cell, axis=0), self.cell, axis=1)
+        pixels[self.cell - 1::self.cell, :] = 0
+        pixels[:, self.cell - 1::self.cell] = 0
+        from PIL import Image
+        b = io.BytesIO()
+        Image.fromarray(pixels, mode="RGB").save(b, format="png")
+        return b.getvalue()
+
+    def color_at(self, x, y):
+        """
+        Returns the (color name, hex string) under a point of the swatch graph, None between or after swatches.
+        """
+        if x is None or y is None or not (0 <= x < self.size[0] and 0 <= y < self.size[1]):
+            return None
+        if int(x) % self.cell == self.cell - 1 or int(y) % self.cell == self.cell - 1:
+            # the gap drawn between swatches
+            return None
+        index = (int(y) // self.cell) * self.row_len + int(x) // self.cell
+        return self.colors[index] if index < len(self.colors) else None
+
+    def build(self):
+        old_look_and_feel = None
+        if self.look_and_feel is not None:
+            old_look_and_feel = sg.CURRENT_LOOK_AND_FEEL
+            sg.theme(self.look_and_feel)
+
+        # graph coordinates run from the top left corner, as image rows do
+        layout = [[sg.Text('Pick a color', font='Def 18')],
+                  [sg.Graph(self.size, (0, self.size[1]), (self.size[0], 0), key='-SWATCHES-', enable_events=True)],
+                  [sg.Button('OK'), sg.T(size=(30, 1), key='-OUT-')]]
+        self.window = sg.Window('Window Title', layout, no_titlebar=True, grab_anywhere=True, keep_on_top=True, finalize=True)
+        self.window['-SWATCHES-'].draw_image(data=self.swatch_image(), location=(0, 0))
+
+        if old_look_and_feel is not None:
+            sg.theme(old_look_and_feel)
+
+    def choose(self):
+        """
+        Shows the picker until OK is pressed or the window is closed.
 
-    button_size = (1, 1)
+        :return: Any(str, None) Returns hex string of color chosen or None if nothing was chosen
+        """
+        self.refresh()
+        if self.window is None:
+            self.build()
+        else:
+            self.window.un_hide()
+            self.window.bring_to_front()
+        self.window['-OUT-']('')
 
-    # button_size = (None,None)         # for very compact buttons
+        color_chosen = None
+        while True:  # Event Loop
+            event, values = self.window.read()
+            if event == sg.WIN_CLOSED:
+                # closed for good, built again next time
+                self.window = None
+                return None
+            if event == 'OK':
+                break
+            color = self.color_at(*values['-SWATCHES-'])
+            if color is not None:
+                self.window['-OUT-'](f'You chose {color[0]} : {color[1]}')
+                color_chosen = color[1]
+        self.window.hide()
+        return color_chosen
 
-    def ColorButton(color):
-        """
-        A User Defined Element - returns a Button that configured in a certain way.
-        :param color: Tuple[str, str] ( color name, hex string)
-        :return: sg.Button object
-        """
-        return sg.B(button_color=('white', color[1]), pad=(0, 0), size=button_size, key=color, tooltip=f'{color[0]}:{color[1]}', border_width=0)
 
-    num_colors = len(list(color_map.keys()))
-    row_len = 40
+# one picker per look and feel, kept across invocations
+_color_pickers = {}
 
-    grid = [[ColorButton(list(color_map.items())[c + j * row_len]) for c in range(0, row_len)] for j in range(0, num_colors // row_len)]
-    grid += [[ColorButton(list(color_map.items())[c + num_colors - num_colors % row_len]) for c in range(0, num_colors % row_len)]]
 
-    layout = [[sg.Text('Pick a color', font='Def 18')]] + grid + \
-             [[sg.Button('OK'), sg.T(size=(30, 1), key='-OUT-')]]
+def popup_color_chooser(look_and_feel=None):
+    """
 
-    window = sg.Window('Window Title', layout, no_titlebar=True, grab_anywhere=True, keep_on_top=True, use_ttk_buttons=True)
-    color_chosen = None
-    while True:  # Event Loop
-        event, values = window.read()
-        if event in (sg.WIN_CLOSED, 'OK'):
-            if event == sg.WIN_CLOSED:
-                color_chosen = None
-            break
-        window['-OUT-'](f'You chose {event[0]} : {event[1]}')
-        color_chosen = event[1]
-    window.close()
-    if old_look_and_feel is not None:
-        sg.theme(old_look_and_feel)
-    return color_chosen
+    :return: Any(str, None) Returns hex string of color chosen or None if nothing was chosen
+    """
+    picker = _color_pickers.get(look_and_feel)
+    if picker is None:
+        picker = _color_pickers[look_and_feel] = ColorPicker(look_and_feel)
+    return picker.choose()
 
 
 def simpleSquare(color,pix=10):
+    from PIL import Image
     i = Image.new("RGB", size=(pix, pix),color=color)
     b = io.BytesIO()
     i.save(b, format="png")
@@ -64,37 +145,116 @@ def simpleSquare(color,pix=10):
 
 
 def findNode(bdata,xclic,yclic):
-    df = bdata.centers
+    return bdata.findNode(xclic,yclic)
 
-    a:pd.Series = (df["xcenter"]-xclic)**2+(df["ycenter"]-yclic)**2
 
-    node = df.loc[a.argmin()]
 
-    colidx,rowidx = node.colidx, node.rowidx
-    return colidx,rowidx
 
+class GraphRenderer():
+    """
+    Retained mode drawing of a bracelet on the editor's sg.Graph.
 
+    Every node keeps its oval between redraws: a redraw only recolors the ovals whose color changed,
+    and ovals are only created for the columns scrolled into view.
+    """
+    def __init__(self, gelem:sg.Graph, column:sg.Column):
+        """
+        :param gelem: The graph the bracelet is drawn on
+        :param column: The scrollable column holding the graph, it gives the visible part of the canvas
+        """
+        self.gelem = gelem
+        self.column = column
+        self.geometry = None
+        self.background = None
+        # (colidx,rowidx) -> [figure id, color drawn]
+        self.figures = {}
+        # columns up to date with the bracelet since the last draw
+        self.drawn_columns = set()
+        self.viewport = None
+
+    def reset(self, bdata:BData):
+        """
+        Clears the canvas and sizes it for the bracelet, ovals are drawn again on the next draw.
+        """
+        canvas_size = bdata.canvas_size()
+        self.gelem.erase()
+        self.gelem.set_size(canvas_size)
+        self.gelem.change_coordinates((0, 0), canvas_size)
+        self.background = self.gelem.draw_rectangle((0, 0), canvas_size, fill_color=bdata.backGroundColor)
+        self.geometry = (bdata.wireCount, bdata.colCount, bdata.masterScale)
+        self.figures = {}
+        self.drawn_columns = set()
+        self.viewport = None
+
+    def visible_columns(self, bdata:BData) -> range:
+        """
+        Returns the columns in the horizontal scroll viewport, with a column of margin on each side.
+        """
+        first, last = self.column.TKColFrame.canvas.xview()
+        width = bdata.canvas_size()[0]
+        step = bdata.masterScale / 2
+        return range(max(int(first * width / step) - 2, 0), min(int(last * width / step) + 2, bdata.colCount))
+
+    def draw(self, bdata:BData):
+        """
+        Brings the visible columns up to date with the bracelet.
+        """
+        if self.geometry != (bdata.wireCount, bdata.colCount, bdata.masterScale):
+            self.reset(bdata)
+        self.gelem.tk_canvas.itemconfig(self.background, fill=bdata.backGroundColor)
+
+        self.viewport = self.visible_columns(bdata)
+        for colidx in self.viewport:
+            for rowidx, coloridx in enumerate(bdata.column_colors(colidx).tolist()):
+                self.draw_node(bdata, colidx, rowidx, coloridx)
+        # columns out of view may be stale now, scroll refreshes them when they come back
+        self.drawn_columns = set(self.viewport)
+
+    def scroll(self, bdata:BData):
+        """
+        Draws the columns scrolled into view that are not up to date since the last draw,
+        nothing if the viewport did not move.
+        """
+        if self.geometry is None:
+            return
+        viewport = self.visible_columns(bdata)
+        if viewport == self.viewport:
+            return
+        self.viewport = viewport
+        for colidx in self.viewport:
+            if colidx not in self.drawn_columns:
+                for rowidx, coloridx in enumerate(bdata.column_colors(colidx).tolist()):
+                    self.draw_node(bdata, colidx, rowidx, coloridx)
+                self.drawn_columns.add(colidx)
+
+    def draw_node(self, bdata:BData, colidx, rowidx, coloridx=None):
+        """
+        Draws a node, or recolors its oval in place when it exists.
+        """
+        if coloridx is None:
+            coloridx = bdata.nodes[(colidx, rowidx)]
+        if coloridx not in bdata.colorRegistry:
+            raise ValueError(f"Color index {coloridx} not found in color registry.")
+        color = bdata.colorRegistry[coloridx]
+
+        figure = self.figures.get((colidx, rowidx))
+        if figure is None:
+            self.figures[(colidx, rowidx)] = [redrawNodeAt(self.gelem,colidx,rowidx,color,bdata.masterScale), color]
+        elif figure[1] != color:
+            self.gelem.tk_canvas.itemconfig(figure[0], fill=color)
+            figure[1] = color
 
 
-def redrawGraph(bdata,window,deep=True):
-    gelem:sg.Graph = window["-GRAPH-"]
+def redrawGraph(bdata,window,deep=False):
+    renderer:GraphRenderer = window["-GRAPH-"].metadata
     if deep:
-        canvas_size = bdata.canvas_size()
-        gelem.set_size(canvas_size)
-        gelem.change_coordinates((0, 0), canvas_size)
-        gelem.draw_rectangle((0, 0), canvas_size, fill_color=bdata.backGroundColor)
-
-    for (colidx,rowidx),coloridx in bdata.nodes.items():
-        if coloridx in bdata.colorRegistry:
-            color = bdata.colorRegistry[coloridx]
-            redrawNodeAt(gelem,colidx,rowidx,color,bdata.masterScale)
-        else:
-            raise ValueError(f"Color index {coloridx} not found in color registry.")
-        
+        renderer.reset(bdata)
+    renderer.draw(bdata)
+
 
 def redrawNodeAt(gelem,colidx,rowidx,color,masterScale):
     f, t = rowColToPixRect(colidx, rowidx,masterScale=masterScale)
-    gelem.draw_oval(f, t, fill_color=color)
+    return gelem.draw_oval(f, t, fill_color=color)
 
 def update_assortment(bdata:BData, window:sg.Window):
 
@@ -146,7 +306,7 @@ def main(args):
                 [colorPickers],
 
                 [sg.Column([[sg.Graph(bdata.canvas_size(), (0, 0), bdata.canvas_size(), key='-GRAPH-',
-                        change_submits=True, drag_submits=False,enable_events=True)]],scrollable=True,expand_y=True)],
+                        change_submits=True, drag_submits=False,enable_events=True)]],key='-GRAPHCOL-',scrollable=True,expand_y=True)],
 
 
                         [sg.Text("Assortment info:"),sg.Text("",key="-ASSORTMENT-")],
@@ -154,6 +314,7 @@ def main(args):
     
     window = sg.Window('Bracelet Editor', layout,resizable=True)
     window.finalize()
+    window["-GRAPH-"].metadata = GraphRenderer(window["-GRAPH-"], window["-GRAPHCOL-"])
 
     if args.bracelet:
         update_assortment(bdata, window)
@@ -164,9 +325,13 @@ def main(args):
     redrawGraph(bdata, window)
 
     while True:
-        event, values = window.read()
+        # the timeout lets columns scrolled into view get drawn
+        event, values = window.read(timeout=200)
         if event in (sg.WIN_CLOSED, 'Cancel'):
             break
+        if event == sg.TIMEOUT_KEY:
+            window["-GRAPH-"].metadata.scroll(bdata)
+            continue
         if event.startswith('Color Picker'):
             window.hide()
             color_chosen = popup_color_chooser('Dark Blue 3')
@@ -187,14 +352,14 @@ def main(args):
 
             newValue = values[event]
             bdata.newWireCount(newValue)
-            redrawGraph(bdata,window,deep=True)
+            redrawGraph(bdata,window)
             update_assortment(bdata, window)
 
         elif event == "-COLCOUNTUP-":
             prev_value = values["-SPIN-"]
             try:
                 bdata.new_col_count(int(prev_value)+1)
-                redrawGraph(bdata,window,deep=True)
+                redrawGraph(bdata,window)
                 window["-SPIN-"].update(int(prev_value)+1)
             except ValueError as e:
                 sg.popup_error(f"Invalid column count: {newValue}\n{e}")
@@ -203,7 +368,7 @@ def main(args):
             prev_value = values["-SPIN-"]
             try:
                 bdata.new_col_count(int(prev_value)-1)
-                redrawGraph(bdata,window,deep=True)
+                redrawGraph(bdata,window)
                 window["-SPIN-"].update(int(prev_value)-1)
             except ValueError as e:
                 sg.popup_error(f"Invalid column count: {newValue}\n{e}")
@@ -212,7 +377,7 @@ def main(args):
             newValue = values["-SPIN-"]
             try:
                 bdata.new_col_count(int(newValue))
-                redrawGraph(bdata,window,deep=True)
+                redrawGraph(bdata,window)
             except ValueError as e:
                 sg.popup_error(f"Invalid column count: {newValue}\n{e}")
             update_assortment(bdata, window)
@@ -224,10 +389,9 @@ def main(args):
             colidx,rowidx = findNode(bdata, x, y)
 
             bdata.setNodeColor(colidx,rowidx,currentColorIdx)
-            color = bdata.colorRegistry[currentColorIdx]
             print(f'click {colidx, rowidx} ')
 
-            redrawNodeAt(window["-GRAPH-"], colidx, rowidx, color,bdata.masterScale)
+            window["-GRAPH-"].metadata.draw_node(bdata, colidx, rowidx)
             
             update_assortment(bdata, window)
 
@@ -260,7 +424,7 @@ def main(args):
                     with open(filename, "r") as fin:
                         bdata = BData.fromJsonstr(fin.read())
 
-                        redrawGraph(bdata, window, deep=True)
+                        redrawGraph(bdata, window)
                         update_assortment(bdata, window)
 
                         update_colorRegistry(bdata.colorRegistry, window)
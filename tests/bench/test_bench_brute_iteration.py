@@ -20,4 +20,29 @@ def test_brute_iteration(benchmark, wirecount):
             c.compute_output()
 
     benchmark(run)
-    
\ No newline at end of file
+
+
+@pytest.mark.parametrize("wirecount", wirecount)
+@pytest.mark.benchmark(group="pix_shader_loop")
+def test_vectorized_iteration(benchmark, wirecount):
+    from pybracelet.BData import BChunk, BData
+    from pybracelet.engine import enumerate_node_type_codes, evaluate_chunk
+    bdata = BData(wireCount=wirecount)
+    c = BChunk(bdata, column_index=0)
+    c.set_input_wire_colors([0,1]* (wirecount//2))
+
+    def run():
+        nodetypes = enumerate_node_type_codes(len(c.colors))
+        evaluate_chunk(c, nodetypes)
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("wirecount", wirecount)
+@pytest.mark.benchmark(group="simulate")
+def test_simulate(benchmark, wirecount):
+    from pybracelet.simulate import random_node_types, simulate
+    node_types = random_node_types(10000, 50, wirecount)
+    start_wires = [0, 1] * (wirecount // 2)
+
+    benchmark(simulate, node_types, start_wires)
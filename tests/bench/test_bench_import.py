@@ -0,0 +1,43 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# seconds spent importing the core model once NumPy is loaded, best of a few fresh interpreters
+IMPORT_BUDGET = 0.1
+HEAVY_MODULES = ("pandas", "scipy", "PIL", "matplotlib")
+CORE_MODULES = ("pybracelet.BData", "pybracelet.bsolver", "pybracelet.engine", "pybracelet.simulate",
+                "pybracelet.bformat", "pybracelet.library", "pybracelet.render", "pybracelet.image_import",
+                "pybracelet.palette", "pybracelet.color_map")
+
+PROBE = """
+import importlib, json, sys, time
+import numpy
+start = time.perf_counter()
+import pybracelet.BData
+elapsed = time.perf_counter() - start
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def probe(*modules):
+    output = subprocess.run([sys.executable, "-c", PROBE, *modules], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def test_core_imports_skip_heavy_modules():
+    modules = probe(*CORE_MODULES)["modules"]
+    assert [name for name in modules if name.split(".")[0] in HEAVY_MODULES] == []
+
+
+def test_import_time_budget():
+    elapsed = min(probe()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET, f"import pybracelet.BData took {elapsed:.3f}s, budget {IMPORT_BUDGET}s"
+
+
+@pytest.mark.benchmark(group="import")
+def test_import(benchmark):
+    benchmark.pedantic(probe, rounds=5)
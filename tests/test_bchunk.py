@@ -1,6 +1,8 @@
 
 
 
+import pytest
+
 from pybracelet.BData import BChunk, BData, NodeType
 
 
@@ -84,4 +86,39 @@ def test_enumerate_possible_nodetypes():
     assert len(node_types) == 3   
 
     assert len(input_deck) == 64
-        
\ No newline at end of file
+
+
+def test_admissible_nodetypes_match_brute_force():
+    bdata = BData(wireCount=6)
+    bdata.setNodeColor(1, 0, 2)
+    bdata.setNodeColor(1, 1, 1)
+
+    asso = bdata.wire_assortment()
+    c = BChunk(bdata, column_index=1)
+
+    expected = []
+    for valid_input in asso.generate_valid_inputs(max_wire_count=6):
+        for nt in c.enumerate_possible_nodetypes():
+            c.set_node_types(nt)
+            c.set_input_wire_colors(valid_input)
+            if c.check_and_compute_output():
+                expected.append((valid_input, nt))
+
+    assert list(c.enumerate_possible_input_wire_colors(asso)) == expected
+
+    c.set_input_wire_colors([0, 0, 0, 0, 0, 0])
+    assert list(c.enumerate_admissible_nodetypes()) == []
+
+
+def test_from_colors_matches_bdata_columns():
+    bdata = BData(wireCount=6)
+    for colidx, colors in ((0, [1, 3, 1]), (1, [2, 1])):
+        for rowidx, color in enumerate(colors):
+            bdata.setNodeColor(colidx, rowidx, color)
+        c = BChunk.from_colors(6, colors)
+        expected = BChunk(bdata, column_index=colidx)
+        assert c.colors == expected.colors
+        assert c.is_even_column() == expected.is_even_column() == (colidx == 0)
+
+    with pytest.raises(ValueError):
+        BChunk.from_colors(6, [1])
@@ -1,4 +1,5 @@
-
+import collections
+import itertools
 
 from pybracelet.BData import Assortment, BData
 
@@ -17,4 +18,121 @@ def test_make_valid_input():
     valid_input_gen = asso.generate_valid_inputs(max_wire_count=wire_count)
 
     valid_inputs = list(valid_input_gen)
-    assert len(valid_inputs) == 120
\ No newline at end of file
+    assert len(valid_inputs) == 120
+
+
+def test_valid_inputs_are_distinct_and_ordered():
+    asso = Assortment({0: 2, 1: 1, 2: 1})
+    valid_inputs = list(asso.generate_valid_inputs(max_wire_count=5))
+
+    assert len(set(map(tuple, valid_inputs))) == len(valid_inputs)
+    assert asso.count_valid_inputs(max_wire_count=5) == len(valid_inputs)
+    for i, valid_input in enumerate(valid_inputs):
+        assert asso.nth_valid_input(5, i) == valid_input
+
+    # slices of the sequence shard it without overlap
+    shards = [list(asso.generate_valid_inputs(5, start=s, stop=s + 7)) for s in range(0, len(valid_inputs), 7)]
+    assert sum(shards, []) == valid_inputs
+
+    # membership agrees with the enumeration
+    for wires in itertools.product(range(4), repeat=5):
+        assert asso.is_valid_input(wires, 5) == (list(wires) in valid_inputs)
+    assert not asso.is_valid_input([0, 0, 1, 2], 5)
+
+
+def test_node_grid_behaves_like_dict():
+    bdata = BData(wireCount=6, colCount=4)
+    assert len(bdata.nodes) == 3 + 2 + 3 + 2
+    assert list(bdata.nodes)[:4] == [(0, 0), (0, 1), (0, 2), (1, 0)]
+    assert (1, 2) not in bdata.nodes
+
+    bdata.setNodeColor(1, 1, 7)
+    assert bdata.nodes[(1, 1)] == 7
+    assert dict(bdata.nodes.items())[(1, 1)] == 7
+    assert bdata.get_column(1) == [(1, 0, 0), (1, 1, 7)]
+    assert bdata.column_colors(1).tolist() == [0, 7]
+
+    # resizing keeps the nodes both sizes share
+    bdata.newWireCount(8)
+    bdata.new_col_count(3)
+    assert bdata.get_column(1) == [(1, 0, 0), (1, 1, 7), (1, 2, 0)]
+    assert len(bdata.nodes) == 4 + 3 + 4
+
+    copy = BData.fromJsonstr(bdata.toJson())
+    assert dict(copy.nodes.items()) == dict(bdata.nodes.items())
+
+
+def test_wire_assortment_tracks_edits():
+    import random
+    random.seed(0)
+
+    bdata = BData(wireCount=8, colCount=9)
+    assert bdata.wire_assortment() == {0: 4}
+
+    for _ in range(300):
+        colidx = random.randrange(bdata.colCount)
+        rowidx = random.randrange(bdata.nodes.node_count(colidx))
+        bdata.setNodeColor(colidx, rowidx, random.choice([0, 1, 2, 14]))
+
+        expected = {}
+        for c in range(bdata.colCount):
+            for color, count in collections.Counter(bdata.column_colors(c).tolist()).items():
+                expected[color] = max(expected.get(color, 0), count)
+        assert bdata.wire_assortment() == expected
+
+
+def test_centers_follow_geometry():
+    from pybracelet.BData import rowColToPixRect
+
+    bdata = BData(wireCount=6, colCount=5, masterScale=64)
+    centers = bdata.centers
+    assert bdata.centers is centers  # cached
+    assert len(centers) == len(bdata.nodes)
+
+    for colidx, rowidx, xcenter, ycenter in centers.tolist():
+        f, t = rowColToPixRect(colidx, rowidx, 64)
+        assert (xcenter, ycenter) == ((f[0] + t[0]) // 2, (f[1] + t[1]) // 2)
+
+    bdata.new_col_count(7)
+    assert len(bdata.centers) == len(bdata.nodes)
+
+
+def test_find_node_matches_nearest_center():
+    import random
+    random.seed(1)
+
+    for masterScale in (64, 33):
+        bdata = BData(wireCount=8, colCount=7, masterScale=masterScale)
+        centers = bdata.centers
+        width, height = bdata.canvas_size()
+        for _ in range(500):
+            x = random.uniform(-masterScale, width + masterScale)
+            y = random.uniform(-masterScale, height + masterScale)
+            nearest = centers[((centers["xcenter"] - x)**2 + (centers["ycenter"] - y)**2).argmin()]
+            assert bdata.findNode(x, y) == (nearest["colidx"], nearest["rowidx"])
+
+
+def test_find_node_skips_empty_columns():
+    # below 4 wires odd columns hold no node
+    bdata = BData(wireCount=2, colCount=5, masterScale=64)
+    for x in range(0, bdata.canvas_size()[0], 7):
+        for y in range(0, bdata.canvas_size()[1], 7):
+            colidx, rowidx = bdata.findNode(x, y)
+            assert (colidx, rowidx) in bdata.nodes
+            bdata.setNodeColor(colidx, rowidx, 1)
+
+
+def test_json_file_loader_reads_in_chunks():
+    import io
+
+    bdata = BData(wireCount=10, colCount=9)
+    bdata.colorRegistry[5] = "#ABCDEF"
+    for i, (colidx, rowidx) in enumerate(list(bdata.nodes)):
+        bdata.setNodeColor(colidx, rowidx, i % 13)
+
+    for indent in (4, None):
+        for chunk_size in (1, 7, 1 << 16):
+            loaded = BData.fromJsonFile(io.StringIO(bdata.toJson(indent=indent)), chunk_size=chunk_size)
+            assert (loaded.wireCount, loaded.colCount) == (10, 9)
+            assert loaded.colorRegistry == bdata.colorRegistry
+            assert dict(loaded.nodes.items()) == dict(bdata.nodes.items())
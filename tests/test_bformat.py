@@ -0,0 +1,54 @@
+import pytest
+
+from pybracelet import bformat
+from pybracelet.BData import BData
+
+
+def make_bdata(color_offset=0):
+    bdata = BData(wireCount=10, colCount=7, masterScale=48)
+    bdata.backGroundColor = "#123456"
+    bdata.colorRegistry[20] = "#ABCDEF"
+    for i, (colidx, rowidx) in enumerate(list(bdata.nodes)):
+        bdata.setNodeColor(colidx, rowidx, (i % 5) + color_offset)
+    return bdata
+
+
+def assert_same(loaded, bdata):
+    assert (loaded.wireCount, loaded.colCount, loaded.masterScale) == (bdata.wireCount, bdata.colCount, bdata.masterScale)
+    assert loaded.backGroundColor == bdata.backGroundColor
+    assert loaded.colorRegistry == bdata.colorRegistry
+    assert dict(loaded.nodes.items()) == dict(bdata.nodes.items())
+
+
+def test_roundtrip_packed_and_compressed():
+    for color_offset in (0, 16):
+        bdata = make_bdata(color_offset)
+        for compress in (False, True):
+            assert_same(bformat.loads(bformat.dumps(bdata, compress=compress)), bdata)
+
+    # 4 bits per node
+    bdata = make_bdata()
+    assert len(bformat.dumps(bdata)) < len(bformat.dumps(make_bdata(16)))
+
+
+def test_save_load_memory_mapped(tmp_path):
+    bdata = make_bdata()
+    path = str(tmp_path / "design.brcl")
+    bformat.save(bdata, path, compress=True)
+    assert_same(bformat.load(path), bdata)
+
+    bformat.save(bdata, path)
+    assert_same(bformat.load(path), bdata)
+
+
+def test_truncated_file(tmp_path):
+    for compress in (False, True):
+        data = bformat.dumps(make_bdata(), compress=compress)
+        for size in range(len(data)):
+            with pytest.raises(ValueError):
+                bformat.loads(data[:size])
+
+    path = tmp_path / "truncated.brcl"
+    path.write_bytes(bformat.dumps(make_bdata())[:5])
+    with pytest.raises(ValueError, match="Truncated"):
+        bformat.load(str(path))
@@ -0,0 +1,201 @@
+import itertools
+import random
+
+import numpy as np
+
+from pybracelet.BData import BData, NodeType
+from pybracelet.bsolver import BSolver
+from pybracelet.simulate import encode_grid, random_node_types, simulate, simulate_bdata
+
+
+def painted_bdata():
+    bdata = BData(wireCount=6, colCount=6)
+    for colidx in range(bdata.colCount):
+        for rowidx in range(3 if colidx % 2 == 0 else 2):
+            bdata.setNodeColor(colidx, rowidx, 1 if (colidx + rowidx) % 3 == 0 else 2)
+    return bdata
+
+
+def expected_colors(bdata):
+    return [[color for _, _, color in bdata.get_column(c)] for c in range(bdata.colCount)]
+
+
+def test_solve_reproduces_pattern():
+    bdata = painted_bdata()
+    solver = BSolver(bdata)
+
+    start_wires, grid = solver.solve()
+    assert len(grid) == bdata.colCount
+    assert solver.replay(start_wires, grid) == expected_colors(bdata)
+
+
+def test_unsolvable_pattern_caches_dead_states():
+    bdata = BData(wireCount=6, colCount=4)
+    # a wire color can not appear in a node that no wire of that color reaches
+    bdata.setNodeColor(0, 0, 1)
+    bdata.setNodeColor(1, 1, 1)
+    bdata.setNodeColor(2, 2, 1)
+
+    solver = BSolver(bdata)
+    assert solver.solve(start_wires=[1, 0, 0, 0, 0, 0]) is None
+    assert (0, (1, 0, 0, 0, 0, 0)) in solver.dead_states
+
+
+def test_column_period():
+    bdata = painted_bdata()
+    assert bdata.column_period() == 6
+
+    bdata = BData(wireCount=6, colCount=10)
+    assert bdata.column_period() == 2
+    bdata.setNodeColor(9, 0, 1)
+    assert bdata.column_period() == 10
+
+
+def test_solve_periodic_tiles_one_repeat():
+    bdata = BData(wireCount=6, colCount=40)
+    for colidx in range(bdata.colCount):
+        for rowidx in range(3 if colidx % 2 == 0 else 2):
+            bdata.setNodeColor(colidx, rowidx, 1 if (colidx + rowidx) % 4 == 0 else 2)
+    assert bdata.column_period() == 4
+
+    solver = BSolver(bdata)
+    start_wires, grid = solver.solve_periodic()
+    assert len(grid) == bdata.colCount
+    assert grid[:4] == grid[4:8]
+    assert solver.replay(start_wires, grid) == expected_colors(bdata)
+
+
+def test_column_transitions_match_node_rules():
+    # 4 bit colors go through the packed transition table, wider colors through NodeType
+    for small, wide in ((1, 2), (1, 20), (17, 20)):
+        bdata = BData(wireCount=6, colCount=2)
+        for colidx, colors in ((0, [small, wide, small]), (1, [wide, small])):
+            for rowidx, color in enumerate(colors):
+                bdata.setNodeColor(colidx, rowidx, color)
+        solver = BSolver(bdata)
+        for column_index in (0, 1):
+            chunk = solver.chunks[column_index]
+            for wires in sorted(set(itertools.permutations([small, wide, small, wide, small, wide]))):
+                expected = {}
+                for node_types in itertools.product(NodeType, repeat=len(chunk.colors)):
+                    chunk.set_input_wire_colors(list(wires))
+                    chunk.set_node_types(list(node_types))
+                    if chunk.check_and_compute_output():
+                        expected.setdefault(tuple(chunk.output_wire_colors), node_types)
+                assert list(solver.column_transitions(column_index, wires)) == list(expected.items())
+
+
+def test_column_predecessors_invert_transitions():
+    bdata = painted_bdata()
+    solver = BSolver(bdata)
+    for column_index in (0, 1):
+        for wires, _ in solver.column_transitions(column_index, (1, 2, 1, 2, 1, 2)):
+            predecessors = [inputs for inputs, _ in solver.column_predecessors(column_index, wires)]
+            assert (1, 2, 1, 2, 1, 2) in predecessors
+
+
+def test_solve_bidirectional():
+    rng = np.random.default_rng(5)
+    start_wires = [1, 2, 3, 1, 2, 3, 4, 4]
+    node_types = random_node_types(1, 120, len(start_wires), rng)
+    colors, end_wires = simulate(node_types, start_wires)
+    bdata = simulate_bdata(start_wires, [tuple(NodeType(code) for code in node_types[0, c, :4 - c % 2])
+                                         for c in range(120)])
+
+    solver = BSolver(bdata)
+    start, grid = solver.solve_bidirectional(start_wires, end_wires[0].tolist())
+    assert start == start_wires and len(grid) == bdata.colCount
+    assert solver.replay(start, grid) == expected_colors(bdata)
+
+    # the ends are constrained: the grid leads to the requested end
+    _, end = simulate(encode_grid(grid, bdata.wireCount), start)
+    assert end.tolist() == end_wires[0].tolist()
+
+    # an unconstrained start is found by the backward search alone
+    start, grid = solver.solve_bidirectional(end_wires=end_wires[0].tolist())
+    assert bdata.wire_assortment().is_valid_input(start, bdata.wireCount)
+    assert solver.replay(start, grid) == expected_colors(bdata)
+    _, end = simulate(encode_grid(grid, bdata.wireCount), start)
+    assert end.tolist() == end_wires[0].tolist()
+
+
+def test_solve_bidirectional_unsolvable():
+    bdata = BData(wireCount=6, colCount=4)
+    bdata.setNodeColor(0, 0, 1)
+    bdata.setNodeColor(1, 1, 1)
+    bdata.setNodeColor(2, 2, 1)
+    assert BSolver(bdata).solve_bidirectional(start_wires=[1, 0, 0, 0, 0, 0]) is None
+
+
+def test_solve_periodic_reuses_dead_states():
+    # a periodic pattern that can not be knotted
+    rng = random.Random(27)
+    period = [[rng.choice([1, 2, 3]) for _ in range(4 - c % 2)] for c in range(6)]
+    bdata = BData(wireCount=8, colCount=60)
+    for colidx in range(bdata.colCount):
+        for rowidx, color in enumerate(period[colidx % 6]):
+            bdata.setNodeColor(colidx, rowidx, color)
+
+    calls = {}
+
+    def counting(solver, key):
+        transitions = solver.column_transitions
+
+        def wrapper(column_index, wires):
+            calls[key] = calls.get(key, 0) + 1
+            return transitions(column_index, wires)
+        solver.column_transitions = wrapper
+        return solver
+
+    assert counting(BSolver(bdata), "solve").solve() is None
+    periodic = counting(BSolver(bdata), "periodic")
+    assert periodic.solve_periodic() is None
+    # the cyclic attempts share what they learn with the full search
+    assert calls["periodic"] <= 2 * calls["solve"]
+
+
+def test_dead_states_hold_for_longer_horizons_only():
+    bdata = BData(wireCount=6, colCount=4)
+    bdata.setNodeColor(0, 0, 1)
+    bdata.setNodeColor(1, 1, 1)
+    bdata.setNodeColor(2, 2, 1)
+    start = [1, 0, 0, 0, 0, 0]
+
+    solver = BSolver(bdata)
+    assert next(solver.iter_solutions(start, column_count=1), None) is not None
+    assert solver.solve(start_wires=start) is None
+    assert solver.dead_states[(0, tuple(start))] == 4
+    # dead for the whole bracelet, still alive for a shorter horizon
+    assert next(solver.iter_solutions(start, column_count=1), None) is not None
+
+
+def test_goal_dead_states_do_not_poison_dead_states():
+    period = [[2, 0, 2], [2, 0], [0, 2, 0], [0, 2]]
+    bdata = BData(wireCount=6, colCount=16)
+    for colidx in range(bdata.colCount):
+        for rowidx, color in enumerate(period[colidx % 4]):
+            bdata.setNodeColor(colidx, rowidx, color)
+
+    solver = BSolver(bdata)
+    for column_count in (4, 8):
+        found = {tuple(start) for start, _ in solver.iter_solutions(column_count=column_count, cyclic=True)}
+        # every start searched on its own, without what the other starts learned
+        expected = {start for start in solver.starting_states()
+                    if next(BSolver(bdata).iter_solutions(start, column_count=column_count, cyclic=True), None)}
+        assert found == expected
+        assert (0, 2, 0, 2, 2, 0) in found
+    assert solver.solve() == BSolver(bdata).solve()
+
+
+def test_assortment_over_wire_count_is_unsolvable():
+    bdata = BData(wireCount=4, colCount=6)
+    for colidx, colors in ((0, [1, 2]), (2, [3, 3]), (4, [0, 0])):
+        for rowidx, color in enumerate(colors):
+            bdata.setNodeColor(colidx, rowidx, color)
+    assert sum(bdata.wire_assortment().values()) > bdata.wireCount
+
+    solver = BSolver(bdata)
+    assert list(solver.starting_states()) == []
+    assert solver.solve() is None
+    assert solver.solve_periodic() is None
+    assert solver.solve_bidirectional(end_wires=[0, 0, 3, 3]) is None
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from pybracelet import color_map
+from pybracelet.color_map import COLOR_MAP, hex_to_rgb, nearest_named_color, nearest_named_colors, rgb_to_lab
+
+
+def test_rgb_to_lab():
+    lab = rgb_to_lab(np.array([[255, 255, 255], [0, 0, 0], [255, 0, 0]]))
+    assert np.allclose(lab[0], (100, 0, 0), atol=0.1)
+    assert np.allclose(lab[1], (0, 0, 0), atol=0.1)
+    assert np.allclose(lab[2], (53.24, 80.09, 67.20), atol=0.5)
+
+
+def test_nearest_named_color():
+    assert nearest_named_color("#FE0101") == ("red", "#FF0000")
+    assert nearest_named_color("#7FFFD5", space="rgb") == ("aquamarine", "#7FFFD4")
+
+    # every named color is its own nearest color
+    hexes = sorted({color.upper() for color in COLOR_MAP.values()})
+    assert [color for _, color in nearest_named_colors(hexes)] == hexes
+    assert [color for _, color in nearest_named_colors(hex_to_rgb(hexes), chunk_size=7)] == hexes
+
+
+def test_palette_is_built_lazily(monkeypatch):
+    # importing the module leaves the palette unbuilt
+    probe = "from pybracelet import color_map; print(color_map._PALETTE is None)"
+    output = subprocess.run([sys.executable, "-c", probe], check=True, capture_output=True, text=True).stdout
+    assert output.strip() == "True"
+
+    # the first lookup builds it, the module global is restored after the test
+    monkeypatch.setattr(color_map, "_PALETTE", None)
+    nearest_named_colors(np.zeros((0, 3), dtype=np.uint8))
+    names, hexes, rgb, lab = color_map._PALETTE
+    assert len(names) == len(hexes) == len(rgb) == len(lab) == len(set(hexes))
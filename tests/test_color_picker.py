@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("FreeSimpleGUI")
+
+import t
+from pybracelet.color_map import COLOR_MAP
+
+
+class StubWindow():
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_color_at_hits_swatches_only():
+    picker = t.ColorPicker(row_len=40, cell=16)
+    assert picker.color_at(0, 0) == picker.colors[0]
+    assert picker.color_at(14, 14) == picker.colors[0]
+    assert picker.color_at(16 * 3 + 5, 16 * 2 + 5) == picker.colors[2 * 40 + 3]
+
+    # gaps between swatches, past the last swatch and outside of the graph
+    assert picker.color_at(15, 5) is None
+    assert picker.color_at(5, 15) is None
+    last_row, last_col = divmod(len(picker.colors), 40)
+    if last_col:
+        assert picker.color_at(16 * last_col + 5, 16 * last_row + 5) is None
+    assert picker.color_at(-1, 5) is None
+    assert picker.color_at(5, picker.size[1]) is None
+    assert picker.color_at(None, None) is None
+
+
+def test_pickers_are_kept_per_theme(monkeypatch):
+    monkeypatch.setattr(t, "_color_pickers", {})
+    monkeypatch.setattr(t.ColorPicker, "choose", lambda picker: picker)
+
+    picker = t.popup_color_chooser("Dark Blue 3")
+    assert t.popup_color_chooser("Dark Blue 3") is picker
+    assert t.popup_color_chooser() is not picker
+    assert len(t._color_pickers) == 2
+
+
+def test_palette_changes_invalidate_the_picker(monkeypatch):
+    picker = t.ColorPicker(row_len=4)
+    window = picker.window = StubWindow()
+    assert not picker.refresh()
+    assert picker.window is window
+
+    monkeypatch.setitem(COLOR_MAP, "test color", "#010203")
+    assert picker.refresh()
+    assert window.closed and picker.window is None
+    row, col = divmod(len(picker.colors) - 1, 4)
+    assert picker.color_at(16 * col, 16 * row) == ("test color", "#010203")
+    assert picker.size[1] == -(-len(COLOR_MAP) // 4) * 16
+    assert not picker.refresh()
@@ -0,0 +1,31 @@
+import numpy as np
+
+from pybracelet.BData import BData
+from pybracelet.constraints import color_constraints, color_uindex, color_uindex_grid, minimal_distribution
+
+
+def make_bdata():
+    bdata = BData(wireCount=8, colCount=6)
+    rng = np.random.default_rng(3)
+    for colidx, rowidx in list(bdata.nodes):
+        bdata.setNodeColor(colidx, rowidx, int(rng.integers(0, 5)))
+    return bdata
+
+
+def test_grid_kernels_match_column_relabelling():
+    bdata = make_bdata()
+    grid = color_uindex_grid(bdata.nodes.colors, bdata.nodes.mask)
+    constraints = color_constraints(bdata.nodes.colors, bdata.nodes.mask)
+
+    for colidx in range(bdata.colCount):
+        ucc, _ = color_uindex(bdata.column_colors(colidx).tolist())
+        assert tuple(grid[colidx, :len(ucc)].tolist()) == ucc
+        assert constraints[colidx] == bytes(ucc)
+
+
+def test_minimal_distribution_matches_wire_assortment():
+    bdata = make_bdata()
+    wire_count, distribution = minimal_distribution(bdata.nodes.colors, bdata.nodes.mask, color_count=7)
+    assert {k: v for k, v in distribution.items() if v} == bdata.wire_assortment()
+    assert wire_count == sum(bdata.wire_assortment().values())
+    assert len(distribution) == 7
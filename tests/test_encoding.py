@@ -0,0 +1,35 @@
+import random
+
+from pybracelet.BData import BChunk, BData, NodeType
+from pybracelet.encoding import (TRANSITIONS, pack_node_types, pack_wires, step_column,
+                                 unpack_node_types, unpack_wires)
+
+
+def test_transitions_match_node_types():
+    for node_type in NodeType:
+        for left in range(16):
+            for right in range(16):
+                entry = TRANSITIONS[(node_type.value << 8) | (right << 4) | left]
+                node_color, output_wires = node_type.compute_output(left, right)
+                assert entry == node_color | (output_wires[0] << 4) | (output_wires[1] << 8)
+
+
+def test_step_column_matches_compute_output():
+    random.seed(2)
+    bdata = BData(wireCount=10)
+    for column_index in (0, 1):
+        c = BChunk(bdata, column_index=column_index)
+        for _ in range(50):
+            wires = [random.randrange(16) for _ in range(10)]
+            node_types = [random.choice(list(NodeType)) for _ in c.colors]
+            c.set_input_wire_colors(wires)
+            c.set_node_types(node_types)
+            c.compute_output()
+
+            packed_types = pack_node_types(node_types)
+            assert unpack_node_types(packed_types, len(node_types)) == [nt.value for nt in node_types]
+            assert unpack_wires(pack_wires(wires), 10) == wires
+
+            node_colors, output = step_column(packed_types, pack_wires(wires), len(c.colors), c.is_even_column())
+            assert unpack_wires(node_colors, len(c.colors)) == c.colors
+            assert unpack_wires(output, 10) == c.output_wire_colors
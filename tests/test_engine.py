@@ -0,0 +1,41 @@
+import numpy as np
+
+from pybracelet.BData import BChunk, BData
+from pybracelet.engine import (decode_node_types, enumerate_node_type_codes, evaluate_chunk, evaluate_node_types,
+                               matching_candidates)
+
+
+def test_evaluate_chunk_matches_compute_output():
+    bdata = BData(wireCount=8)
+    for column_index in (0, 1):
+        c = BChunk(bdata, column_index=column_index)
+        c.set_input_wire_colors([1, 2, 1, 3, 2, 2, 3, 1])
+
+        codes = enumerate_node_type_codes(len(c.colors))
+        node_colors, output_wires = evaluate_chunk(c, codes)
+
+        candidates = decode_node_types(codes)
+        assert candidates == list(c.enumerate_possible_nodetypes())
+        for k, nt in enumerate(candidates):
+            c.set_node_types(nt)
+            c.compute_output()
+            assert node_colors[k].tolist() == c.colors
+            assert output_wires[k].tolist() == c.output_wire_colors
+
+        # per candidate inputs take the other path
+        per_candidate = np.broadcast_to(c.input_wire_colors, (len(codes), bdata.wireCount))
+        for expected, computed in zip((node_colors, output_wires),
+                                      evaluate_node_types(codes, per_candidate, c.is_even_column())):
+            assert np.array_equal(expected, computed)
+
+
+def test_matching_candidates():
+    bdata = BData(wireCount=6)
+    bdata.setNodeColor(0, 0, 1)
+    bdata.setNodeColor(0, 1, 3)
+    bdata.setNodeColor(0, 2, 5)
+    c = BChunk(bdata, column_index=0)
+    c.set_input_wire_colors([1, 2, 3, 4, 5, 6])
+
+    mask = matching_candidates(c, enumerate_node_type_codes(3))
+    assert np.count_nonzero(mask) == 8
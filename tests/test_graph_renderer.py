@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip("FreeSimpleGUI")
+
+from pybracelet.BData import BData
+from t import GraphRenderer
+
+
+class StubCanvas():
+    def __init__(self):
+        self.fills = {}
+
+    def itemconfig(self, figure, fill):
+        self.fills[figure] = fill
+
+
+class StubGraph():
+    """
+    The part of sg.Graph used by GraphRenderer, without Tk.
+    """
+    def __init__(self):
+        self.tk_canvas = StubCanvas()
+
+    def erase(self):
+        self.tk_canvas.fills = {}
+
+    def set_size(self, size):
+        pass
+
+    def change_coordinates(self, bottom_left, top_right):
+        pass
+
+    def draw_rectangle(self, top_left, bottom_right, fill_color):
+        return self._draw(fill_color)
+
+    def draw_oval(self, top_left, bottom_right, fill_color):
+        return self._draw(fill_color)
+
+    def _draw(self, fill_color):
+        figure = len(self.tk_canvas.fills) + 1
+        self.tk_canvas.fills[figure] = fill_color
+        return figure
+
+
+class StubColumn():
+    """
+    A scrollable sg.Column, `view` is the visible fraction of the canvas.
+    """
+    def __init__(self):
+        self.view = (0.0, 0.25)
+        outer = self
+
+        class Canvas():
+            def xview(self):
+                return outer.view
+
+        class Frame():
+            canvas = Canvas()
+
+        self.TKColFrame = Frame()
+
+
+def assert_up_to_date(renderer, bdata):
+    fills = renderer.gelem.tk_canvas.fills
+    for (colidx, rowidx), (figure, _) in renderer.figures.items():
+        if colidx in renderer.viewport:
+            assert fills[figure] == bdata.colorRegistry[bdata.nodes[(colidx, rowidx)]]
+
+
+def test_scroll_refreshes_stale_columns():
+    bdata = BData(wireCount=8, colCount=60)
+    renderer = GraphRenderer(StubGraph(), StubColumn())
+    renderer.draw(bdata)
+
+    for view in ((0.75, 1.0), (0.0, 0.25)):
+        renderer.column.view = view
+        renderer.scroll(bdata)
+        assert_up_to_date(renderer, bdata)
+
+    # a redraw that is not a reset, with columns drawn before out of view
+    bdata.colorRegistry[0] = "#123456"
+    renderer.draw(bdata)
+    renderer.column.view = (0.75, 1.0)
+    renderer.scroll(bdata)
+    assert_up_to_date(renderer, bdata)
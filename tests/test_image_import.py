@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from pybracelet.image_import import default_col_count, image_to_bdata, kmeans_colors, sample_nodes
+from pybracelet.render import render_array
+
+
+def striped_image():
+    # left half red, right half blue, a green band at the bottom
+    image = np.zeros((120, 400, 3), dtype=np.uint8)
+    image[:, :200] = (255, 0, 0)
+    image[:, 200:] = (0, 0, 255)
+    image[100:] = (0, 255, 0)
+    return image
+
+
+def test_sample_nodes():
+    samples = sample_nodes(striped_image(), wireCount=12, colCount=30)
+    assert samples.shape == (30, 6, 3)
+    # row 0 is at the bottom of the image
+    assert (samples[:, 0] == (0, 255, 0)).all()
+    assert (samples[0, 3] == (255, 0, 0)).all()
+    assert (samples[-1, 3] == (0, 0, 255)).all()
+
+
+def test_kmeans_colors():
+    rng = np.random.default_rng(0)
+    centers = np.array([(20, 20, 20), (200, 40, 40), (40, 40, 200)])
+    samples = np.concatenate([rng.normal(center, 4, size=(200, 3)) for center in centers])
+    labels, centroids = kmeans_colors(samples, 3, rng=rng)
+    assert len(np.unique(labels)) == 3
+    assert np.abs(centroids[labels[::200]] - centers).max() < 3
+
+
+def test_image_to_bdata():
+    image = striped_image()
+    bdata = image_to_bdata(image, wireCount=12, color_count=3, rng=np.random.default_rng(1))
+    assert bdata.colCount == default_col_count(image.shape, 12) == 42
+    assert sorted(bdata.colorRegistry.values()) == ["#0000FF", "#00FF00", "#FF0000"]
+    assert len(set(bdata.nodes.values())) == 3
+
+    # too few distinct colors for the requested palette
+    bdata = image_to_bdata(image, wireCount=12, colCount=10, color_count=6, rng=np.random.default_rng(1))
+    assert len(bdata.colorRegistry) == 3
+    assert render_array(bdata).shape == (bdata.canvas_size()[1], bdata.canvas_size()[0], 3)
+
+
+@pytest.mark.parametrize("mode", ["P", "LA", "CMYK"])
+def test_pil_images_are_converted_to_rgb(mode):
+    Image = pytest.importorskip("PIL.Image")
+    image = Image.fromarray(striped_image()).convert(mode)
+    samples = sample_nodes(image, wireCount=12, colCount=30)
+    assert samples.shape == (30, 6, 3)
+    assert (samples == sample_nodes(np.asarray(image.convert("RGB")), wireCount=12, colCount=30)).all()
+
+
+def test_palette_image_to_bdata():
+    Image = pytest.importorskip("PIL.Image")
+    image = Image.new("RGB", (40, 60), (255, 0, 0)).quantize()
+    assert image.mode == "P"
+    bdata = image_to_bdata(image, wireCount=6, color_count=2, rng=np.random.default_rng(1))
+    assert list(bdata.colorRegistry.values()) == ["#FF0000"]
@@ -0,0 +1,74 @@
+import os
+
+from pybracelet import bformat
+from pybracelet.BData import BData
+from pybracelet.library import DesignLibrary
+
+
+def write_design(path, wireCount, color):
+    bdata = BData(wireCount=wireCount, colCount=4)
+    bdata.setNodeColor(0, 0, color)
+    with open(path, "w") as fout:
+        fout.write(bdata.toJson())
+    return bdata
+
+
+def test_scan_is_incremental(tmp_path):
+    write_design(tmp_path / "a.json", 6, 1)
+    write_design(tmp_path / "b.json", 8, 2)
+    bformat.save(BData(wireCount=8, colCount=6), str(tmp_path / "c.brcl"))
+
+    library = DesignLibrary(str(tmp_path))
+    assert library.scan() == ["a.json", "b.json", "c.brcl"]
+    assert library.filter(wireCount=8) == ["b.json", "c.brcl"]
+    assert library.filter(colors=["#00ff00"]) == ["b.json"]
+
+    # reopening reads the index instead of the designs
+    library = DesignLibrary(str(tmp_path))
+    assert len(library) == 3
+    assert library.scan() == []
+
+    # touched but identical designs are not parsed again
+    os.utime(tmp_path / "a.json", ns=(0, 0))
+    write_design(tmp_path / "b.json", 8, 3)
+    os.remove(tmp_path / "c.brcl")
+    assert library.scan() == ["b.json"]
+    assert library.filter(colors=["#0000FF"]) == ["b.json"]
+    assert len(library) == 2
+
+
+def test_batch_validate_and_render(tmp_path):
+    write_design(tmp_path / "a.json", 6, 1)
+    write_design(tmp_path / "b.json", 8, 2)
+    library = DesignLibrary(str(tmp_path))
+    library.scan()
+
+    assert library.validate(max_workers=2) == {"a.json": True, "b.json": True}
+
+    previews = library.render(str(tmp_path / "previews"), max_workers=2)
+    assert all(os.path.exists(path) for path in previews.values())
+
+
+def test_batch_records_failing_designs(tmp_path):
+    write_design(tmp_path / "a.json", 6, 1)
+    write_design(tmp_path / "b.json", 8, 2)
+    (tmp_path / "bad.json").write_text("[not a design")
+    (tmp_path / "truncated.brcl").write_bytes(bformat.dumps(BData(wireCount=6, colCount=4))[:5])
+    (tmp_path / "incomplete.json").write_text("{}")
+    library = DesignLibrary(str(tmp_path))
+    assert library.scan() == ["a.json", "b.json", "bad.json", "incomplete.json", "truncated.brcl"]
+    assert all("error" in library.index[name] for name in ("bad.json", "incomplete.json", "truncated.brcl"))
+    assert len(DesignLibrary(str(tmp_path))) == 5
+
+    # designs that failed to parse are left out by default
+    assert library.validate(max_workers=2) == {"a.json": True, "b.json": True}
+
+    # a design broken since the scan does not discard the other results
+    (tmp_path / "b.json").write_text("[not a design")
+    results = library.validate(max_workers=2)
+    assert results["a.json"] is True
+    assert set(results["b.json"]) == {"error"}
+
+    previews = library.render(str(tmp_path / "previews"), names=["a.json", "b.json"], max_workers=2)
+    assert os.path.exists(previews["a.json"])
+    assert set(previews["b.json"]) == {"error"}
@@ -0,0 +1,57 @@
+import itertools
+
+import numpy as np
+
+from pybracelet.BData import BData
+from pybracelet.image_import import image_to_bdata
+from pybracelet.palette import color_costs, fit_wire_count
+
+
+def brute_force_cost(costs, mask, wireCount):
+    # best total cost over every labelling, for tiny grids
+    nodes = np.argwhere(mask)
+    color_count = costs.shape[2]
+    labellings = np.array(list(itertools.product(range(color_count), repeat=len(nodes))))
+    onehot = labellings[:, :, None] == np.arange(color_count)
+    caps = np.max([onehot[:, nodes[:, 0] == colidx].sum(axis=1) for colidx in range(mask.shape[0])], axis=0)
+    totals = costs[nodes[:, 0], nodes[:, 1]][np.arange(len(nodes)), labellings].sum(axis=1)
+    return totals[caps.sum(axis=1) <= wireCount].min()
+
+
+def test_fit_wire_count_respects_budget():
+    rng = np.random.default_rng(0)
+    bdata = BData(wireCount=8, colCount=40)
+    samples = rng.uniform(0, 255, size=(40, 4, 3))
+    palette = rng.uniform(0, 255, size=(6, 3))
+    costs = color_costs(samples, palette)
+
+    free, _ = fit_wire_count(costs, bdata.nodes.mask, wireCount=100)
+    assert np.array_equal(free[bdata.nodes.mask], costs.argmin(axis=2)[bdata.nodes.mask])
+
+    labels, assortment = fit_wire_count(costs, bdata.nodes.mask, wireCount=8)
+    bdata.nodes.colors[:] = labels
+    assert bdata.wire_assortment() == assortment
+    assert bdata.validate_assortment(assortment)
+
+
+def test_fit_wire_count_near_optimal():
+    # the documented bound of `fit_wire_count`, over random 3 x 2 grids
+    ratios = []
+    for seed in range(200):
+        rng = np.random.default_rng(seed)
+        bdata = BData(wireCount=4, colCount=3)
+        costs = color_costs(rng.uniform(0, 255, size=(3, 2, 3)), rng.uniform(0, 255, size=(3 + seed % 2, 3)))
+        for wireCount in (2, 3):
+            labels, assortment = fit_wire_count(costs, bdata.nodes.mask, wireCount)
+            assert sum(assortment.values()) <= wireCount
+            total = np.take_along_axis(costs, labels[:, :, None].astype(np.int64), axis=2)[:, :, 0][bdata.nodes.mask].sum()
+            ratios.append(total / brute_force_cost(costs, bdata.nodes.mask, wireCount))
+    assert max(ratios) <= 1.1
+    assert np.mean(np.isclose(ratios, 1)) >= 0.95
+
+
+def test_image_to_bdata_fits_wires():
+    rng = np.random.default_rng(2)
+    image = rng.integers(0, 256, size=(60, 300, 3), dtype=np.uint8)
+    bdata = image_to_bdata(image, wireCount=10, color_count=8, rng=rng)
+    assert bdata.validate_assortment(bdata.wire_assortment())
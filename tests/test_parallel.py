@@ -0,0 +1,44 @@
+from pybracelet import bformat
+from pybracelet.BData import BChunk, BData
+from pybracelet.parallel import _solve_shard, parallel_enumerate_possible_input_wire_colors
+
+
+def make_bdata():
+    bdata = BData(wireCount=8, colCount=4)
+    bdata.setNodeColor(0, 0, 1)
+    bdata.setNodeColor(0, 1, 2)
+    bdata.setNodeColor(0, 3, 1)
+    bdata.setNodeColor(1, 1, 2)
+    return bdata
+
+
+def test_parallel_matches_serial():
+    bdata = make_bdata()
+    asso = bdata.wire_assortment()
+    serial = [(list(i), tuple(nt)) for i, nt in BChunk(bdata, 0).enumerate_possible_input_wire_colors(asso)]
+
+    parallel = list(parallel_enumerate_possible_input_wire_colors(bdata, 0, max_workers=2, shard_size=50))
+    assert parallel == serial
+
+    unordered = list(parallel_enumerate_possible_input_wire_colors(bdata, 0, max_workers=2, shard_size=50, ordered=False))
+    def key(solution):
+        return solution[0], [nt.value for nt in solution[1]]
+    assert sorted(unordered, key=key) == sorted(serial, key=key)
+
+
+def test_parallel_stops_at_limit():
+    bdata = make_bdata()
+    first = list(parallel_enumerate_possible_input_wire_colors(bdata, 0, max_workers=2, shard_size=10, limit=5))
+    assert len(first) == 5
+
+
+def test_shard_stops_at_limit():
+    # a single color: every node type of every node matches, 4**8 solutions for the only input
+    bdata = BData(wireCount=16, colCount=2)
+    items = list(bdata.wire_assortment().items())
+    solutions = _solve_shard(bformat.dumps(bdata), 0, items, 0, 1, limit=3)
+    # node types packed 2 bits per node, the last node varies first
+    assert solutions == [([0] * 16, [0, 1 << 14, 2 << 14])]
+
+    first = list(parallel_enumerate_possible_input_wire_colors(bdata, 0, max_workers=1, limit=2))
+    assert [node_types[-1].value for _, node_types in first] == [0, 1]
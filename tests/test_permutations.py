@@ -0,0 +1,21 @@
+import itertools
+
+from pybracelet.permutations import MultisetPermutations
+
+
+def test_multiset_permutations_match_itertools():
+    elements = [2, 0, 1, 0, 2, 0]
+    perms = MultisetPermutations(elements)
+
+    expected = sorted(set(itertools.permutations(elements)))
+    assert [tuple(p) for p in perms] == expected
+    assert perms.count() == len(expected)
+
+
+def test_multiset_permutations_rank_unrank():
+    perms = MultisetPermutations([3, 1, 1, 2, 3])
+    for i, p in enumerate(perms):
+        assert perms.nth(i) == p
+        assert perms.rank(p) == i
+
+    assert list(perms.iterate(5, 9)) == [perms.nth(i) for i in range(5, 9)]
@@ -0,0 +1,25 @@
+from pybracelet.BData import BData
+from pybracelet.render import render, render_array, render_bytes
+
+
+def test_render_array_places_nodes():
+    bdata = BData(wireCount=6, colCount=4, masterScale=32)
+    bdata.setNodeColor(1, 1, 1)
+
+    image = render_array(bdata)
+    width, height = bdata.canvas_size()
+    assert image.shape == (height, width, 3)
+
+    # node centers, flipped from graph coordinates
+    for (colidx, rowidx), coloridx in bdata.nodes.items():
+        match = bdata.centers[(bdata.centers["colidx"] == colidx) & (bdata.centers["rowidx"] == rowidx)][0]
+        expected = (255, 0, 0) if coloridx == 1 else (255, 255, 255)
+        assert tuple(image[height - match["ycenter"], match["xcenter"]]) == expected
+    assert tuple(image[0, 0]) == (0, 0, 0)
+
+
+def test_render_outputs():
+    bdata = BData(wireCount=6, colCount=4)
+    assert render(bdata, masterScale=16).size == (4 * 16, 3 * 16)
+    assert render_bytes(bdata).startswith(b"\x89PNG")
+    assert len(render_bytes(bdata, masterScale=16, format="raw")) == 4 * 16 * 3 * 16 * 3
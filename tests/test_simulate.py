@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from pybracelet.BData import BChunk, BData, NodeType
+from pybracelet.simulate import encode_grid, random_node_types, simulate, simulate_bdata
+
+
+def reference_colors(start_wires, grid):
+    bdata = BData(wireCount=len(start_wires), colCount=len(grid))
+    wires = list(start_wires)
+    colors = []
+    for column_index, node_types in enumerate(grid):
+        chunk = BChunk(bdata, column_index)
+        chunk.set_input_wire_colors(list(wires))
+        chunk.set_node_types(list(node_types))
+        chunk.compute_output()
+        colors.append(list(chunk.colors))
+        wires = list(chunk.output_wire_colors)
+    return colors, wires
+
+
+def test_simulate_matches_compute_output():
+    rng = np.random.default_rng(3)
+    start_wires = [1, 1, 2, 3, 3, 4, 2, 1]
+    codes = random_node_types(20, 9, len(start_wires), rng)
+    colors, final_wires = simulate(codes, start_wires)
+    assert colors.shape == (20, 9, 4)
+
+    for k in range(len(codes)):
+        grid = [tuple(NodeType(code) for code in codes[k, c, :4 - c % 2]) for c in range(9)]
+        expected_colors, expected_wires = reference_colors(start_wires, grid)
+        assert [colors[k, c, :4 - c % 2].tolist() for c in range(9)] == expected_colors
+        assert final_wires[k].tolist() == expected_wires
+
+
+def test_simulate_bdata():
+    grid = [(NodeType.LL, NodeType.RR, NodeType.LR), (NodeType.RL, NodeType.LL),
+            (NodeType.LR, NodeType.LR, NodeType.RR)]
+    start_wires = [1, 2, 3, 1, 2, 3]
+    bdata = simulate_bdata(start_wires, grid, colorRegistry={1: "#FF0000", 2: "#00FF00", 3: "#0000FF"})
+
+    assert bdata.colCount == 3 and bdata.wireCount == 6
+    expected_colors, _ = reference_colors(start_wires, grid)
+    assert [bdata.column_colors(c).tolist() for c in range(3)] == expected_colors
+    assert np.array_equal(encode_grid(grid, 6)[1], [3, 0, 0])
+
+    # colors the node grid can not hold are refused, not wrapped
+    for color in (256, -1):
+        with pytest.raises(ValueError):
+            simulate_bdata([1, 2, 3, 1, 2, color], grid)
+
+
+def test_simulate_wide_colors():
+    rng = np.random.default_rng(4)
+    start_wires = [300, 1, 2, 300, 7, 1]
+    codes = random_node_types(5, 6, len(start_wires), rng)
+    colors, final_wires = simulate(codes, start_wires)
+
+    for k in range(len(codes)):
+        grid = [tuple(NodeType(code) for code in codes[k, c, :3 - c % 2]) for c in range(6)]
+        expected_colors, expected_wires = reference_colors(start_wires, grid)
+        assert [colors[k, c, :3 - c % 2].tolist() for c in range(6)] == expected_colors
+        assert final_wires[k].tolist() == expected_wires
@@ -0,0 +1,56 @@
+import itertools
+
+import numpy as np
+
+from pybracelet.BData import Assortment, BChunk, BData, NodeType
+from pybracelet.bsolver import BSolver
+from pybracelet.simulate import random_node_types, simulate_bdata
+from pybracelet.solve_cache import ChunkSolutionCache
+
+
+def make_bdata():
+    bdata = BData(wireCount=6, colCount=4)
+    for rowidx, color in enumerate([1, 3, 1]):
+        bdata.setNodeColor(0, rowidx, color)
+    for rowidx, color in enumerate([2, 0, 2]):
+        bdata.setNodeColor(2, rowidx, color)
+    return bdata
+
+
+def as_set(solutions):
+    return {(tuple(inputs), tuple(nt.value for nt in node_types)) for inputs, node_types in solutions}
+
+
+def test_relabelled_columns_are_solved_once(tmp_path):
+    bdata = make_bdata()
+
+    cache = ChunkSolutionCache(directory=str(tmp_path))
+    for column_index, assortment in ((0, Assortment({1: 2, 3: 1, 0: 3})), (2, Assortment({2: 2, 0: 1, 1: 3}))):
+        chunk = BChunk(bdata, column_index)
+        expected = as_set(chunk.enumerate_possible_input_wire_colors(assortment))
+        assert as_set(cache.solve(chunk, assortment)) == expected
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    # solutions are found again on disk
+    cache = ChunkSolutionCache(directory=str(tmp_path))
+    chunk = BChunk(bdata, 0)
+    cache.solve(chunk, Assortment({1: 2, 3: 1, 0: 3}))
+    assert (cache.misses, cache.hits) == (0, 1)
+
+
+def test_solver_shares_column_solutions():
+    # a repeated pair of columns, knotted from wires that come back relabelled
+    node_types = random_node_types(1, 2, 6, np.random.default_rng(0))
+    bdata = simulate_bdata([1, 2, 1, 3, 2, 3], [tuple(NodeType(int(code)) for code in node_types[0, c % 2, :3 - c % 2])
+                                                for c in range(24)])
+
+    cache = ChunkSolutionCache()
+    solver = BSolver(bdata, cache=cache)
+    solution = solver.solve()
+    assert solution is not None and solution == BSolver(bdata).solve()
+    for column_index in range(bdata.colCount):
+        for wires in itertools.islice(bdata.wire_assortment().generate_valid_inputs(6), 0, None, 7):
+            assert list(solver.column_transitions(column_index, tuple(wires))) == \
+                list(BSolver(bdata).column_transitions(column_index, tuple(wires)))
+    # equivalent columns are solved once for every wire multiset
+    assert cache.misses < cache.hits
@@ -0,0 +1,48 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import solver
+
+
+def make_nodes():
+    # 6 wires: columns 0 and 2 hold 3 nodes, column 1 holds 2, rows given out of order
+    colors = {0: [2, 0, 2], 1: [1, 1], 2: [0, 2, 1]}
+    rows = [(colidx % 2, colidx, colidx, rowidx, rowidx + 0.5 * (colidx % 2), cidx)
+            for colidx, column in colors.items() for rowidx, cidx in enumerate(column)]
+    nodes = pd.DataFrame(rows, columns=["coltype", "colidx", "x", "rowidx", "y", "cidx"])
+    return nodes.sample(frac=1, random_state=3).reset_index(drop=True)
+
+
+def test_dense_nodes_and_minimal_distribution():
+    values, mask = solver.dense_nodes(make_nodes())
+    assert values.tolist() == [[2, 0, 2], [1, 1, 0], [0, 2, 1]]
+    assert mask.tolist() == [[True, True, True], [True, True, False], [True, True, True]]
+
+    assert solver.minimalDistribution(make_nodes(), 3) == (5, {0: 1, 1: 2, 2: 2})
+
+
+def test_color_constraints():
+    nodes = make_nodes()
+    colorIndex = solver.colorUIndex(nodes)
+    assert list(colorIndex.columns) == ["ucidx", "colidx", "cidx"]
+    assert colorIndex.dtypes.tolist() == [np.int64] * 3
+    assert colorIndex["ucidx"].tolist() == [0, 1, 0, 0, 1, 2]
+    assert colorIndex["colidx"].tolist() == [0, 0, 1, 2, 2, 2]
+    assert colorIndex["cidx"].tolist() == [2, 0, 1, 0, 2, 1]
+
+    nodesUindexed = solver.re_index(nodes, colorIndex)
+    assert list(nodesUindexed.columns) == list(nodes.columns) + ["ucidx"]
+    assert nodesUindexed["ucidx"].dtype == np.int64
+    by_node = nodesUindexed.sort_values(["colidx", "rowidx"])
+    assert by_node["ucidx"].tolist() == [0, 1, 0, 0, 0, 0, 1, 2]
+
+    colorConstraints = solver.getColorConstraints(nodesUindexed)
+    assert list(colorConstraints.columns) == ["colidx", "ucc", "dc", "ucidx"]
+    assert colorConstraints["colidx"].tolist() == [0, 1, 2]
+    assert colorConstraints["ucc"].tolist() == [(0, 1, 0), (0, 0), (0, 1, 2)]
+    assert colorConstraints["dc"].tolist() == [Counter({2: 2, 0: 1}), Counter({1: 2}), Counter({0: 1, 2: 1, 1: 1})]
+    assert colorConstraints["ucidx"].tolist() == [Counter({0: 2, 1: 1}), Counter({0: 2}), Counter({0: 1, 1: 1, 2: 1})]